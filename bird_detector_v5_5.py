@@ -15,55 +15,318 @@ import time
 import cv2
 import numpy as np
 import threading
+import queue
+import itertools
+import functools
+import heapq
+import ctypes
+import ctypes.util
+import atexit
+import signal
 import yaml
-import re
+import struct
 from pathlib import Path
+from collections import namedtuple
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # GStreamer и Hailo
 import gi
 gi.require_version('Gst', '1.0')
 from gi.repository import Gst, GLib
 import hailo
-import hailo_platform
 from hailo_apps.hailo_app_python.core.common.buffer_utils import get_numpy_from_buffer
 from hailo_apps.hailo_app_python.core.gstreamer.gstreamer_app import app_callback_class
 from hailo_apps.hailo_app_python.apps.detection.detection_pipeline import GStreamerDetectionApp
 
+# libjpeg-turbo (опционально): SIMD-кодирование JPEG, в 2-6 раз быстрее cv2.imwrite на ARM
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJPF_RGB, TJSAMP_420, TJSAMP_422
+    turbo_jpeg = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+except (ImportError, OSError, RuntimeError):
+    TURBOJPEG_AVAILABLE = False
+
+# Numba (опционально): JIT для пересчета bbox в пиксели; без нее - векторная версия numpy
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# libyaml (если PyYAML собран с ним): тот же safe-разбор, в 10-20 раз быстрее
+try:
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader
+
 Gst.init(None)
 
 
-def get_caps_info(caps):
-    """Упрощенное получение параметров кадра из caps (только Метод 2, без отладочных логов)."""
+# Кэш результатов разбора caps: {указатель GstCaps: (caps, (format, width, height))}
+# caps меняются только при перенастройке пайплайна, поэтому кэш почти всегда попадает
+_CAPS_CACHE = {}
+_CAPS_CACHE_SIZE = 8
+
+# Последние caps (указатель, caps, результат) - быстрый путь без обращения к словарю
+_last_caps = (None, None, None)
+
+
+def parse_caps(caps: "Gst.Caps") -> tuple[str, int, int]:
+    """Разбор параметров кадра из caps через API GstStructure."""
+    # Пустые caps (ANY/EMPTY) - значения по умолчанию
+    if caps.get_size() == 0:
+        return "RGB", 1280, 720
+
+    # Прямой доступ к полям GstStructure без сериализации caps в строку
+    structure = caps.get_structure(0)
+
+    format_str = structure.get_string("format") or "RGB"
+
+    # get_int возвращает пару (успех, значение) - явная проверка каждого поля
+    width_ok, width = structure.get_int("width")
+    height_ok, height = structure.get_int("height")
+
+    return format_str, width if width_ok else 1280, height if height_ok else 720
+
+
+def get_caps_info(caps: "Gst.Caps | None") -> tuple[str | None, int | None, int | None]:
+    """Получение параметров кадра из caps с кэшированием по идентичности caps."""
+    global _last_caps
     if not caps:
         return None, None, None
 
+    # PyGObject создает новую Python-обертку на каждый get_current_caps(),
+    # поэтому id(caps) не стабилен; hash() у GstCaps - адрес C-структуры
+    key = hash(caps)
+    last = _last_caps
+    if last[0] == key:
+        return last[2]
+
+    hit = _CAPS_CACHE.get(key)
+    if hit is None:
+        # FIFO-вытеснение; ссылка на caps в кэше не дает переиспользовать адрес
+        if len(_CAPS_CACHE) >= _CAPS_CACHE_SIZE:
+            del _CAPS_CACHE[next(iter(_CAPS_CACHE))]
+        hit = _CAPS_CACHE[key] = (caps, parse_caps(caps))
+
+    # Сильная ссылка на caps удерживает адрес и после вытеснения из словаря
+    _last_caps = (key, hit[0], hit[1])
+    return hit[1]
+
+
+# Строковое время текущей секунды: photo - для имен фото, log - для логов, time - ЧЧ:ММ:СС
+WallClock = namedtuple('WallClock', ['sec', 'photo', 'log', 'time'])
+_wall_clock = WallClock(None, '', '', '')
+
+
+def get_wall_clock(ts: float | None = None) -> WallClock:
+    """
+    Строки текущего времени с пересчетом не чаще раза в секунду.
+
+    Уникальность имен фото обеспечивает счетчик photo_count, поэтому
+    точности до секунды достаточно.
+    """
+    global _wall_clock
+    sec = int(time.time() if ts is None else ts)
+    clock = _wall_clock
+    if clock.sec != sec:
+        # localtime + f-строки вместо datetime.strftime: без разбора шаблона и локали
+        tm = time.localtime(sec)
+        date = f"{tm.tm_year:04d}{tm.tm_mon:02d}{tm.tm_mday:02d}"
+        hh, mm, ss = f"{tm.tm_hour:02d}", f"{tm.tm_min:02d}", f"{tm.tm_sec:02d}"
+        clock = WallClock(sec,
+                          f"{date}_{hh}{mm}{ss}",
+                          f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}_{hh}-{mm}-{ss}",
+                          f"{hh}:{mm}:{ss}")
+        # Замена ссылки атомарна: другие потоки видят согласованный кортеж
+        _wall_clock = clock
+    return clock
+
+
+# Опубликованный кадр стрима: seq - номер кадра (буферы переиспользуются, идентичность не уникальна)
+StreamFrame = namedtuple('StreamFrame', ['seq', 'image'])
+
+# Число заранее выделенных BGR-буферов на стрим: один опубликован, один может
+# кодироваться, в третий пишется новый кадр (занятые буферы не перезаписываются)
+STREAM_BUFFERS = 3
+
+# Заголовок части multipart/x-mixed-replace: кадр уходит клиенту одной записью
+MJPEG_PART_HEADER = b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n'
+
+# Информационная панель стрима детекции: подписи статичны и растеризуются один раз,
+# на каждом кадре рисуются только значения
+INFO_PANEL_LABELS = ("Frame:", "FPS:", "Birds:", "Active:", "Unique:", "Visits:", "Temp:", "Time:")
+INFO_PANEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+INFO_PANEL_SCALE = 0.6
+INFO_PANEL_THICKNESS = 2
+INFO_PANEL_TOP = 30
+INFO_PANEL_STEP = 25
+
+
+def build_info_panel_labels() -> tuple[np.ndarray, int]:
+    """Заготовка с подписями панели (белый текст на черном) и x-координата значений."""
+    label_width = max(
+        cv2.getTextSize(label, INFO_PANEL_FONT, INFO_PANEL_SCALE, INFO_PANEL_THICKNESS)[0][0]
+        for label in INFO_PANEL_LABELS
+    )
+    values_x = 10 + label_width + 8
+    height = INFO_PANEL_TOP + INFO_PANEL_STEP * (len(INFO_PANEL_LABELS) - 1) + 10
+
+    overlay = np.zeros((height, values_x, 3), dtype=np.uint8)
+    y_offset = INFO_PANEL_TOP
+    for label in INFO_PANEL_LABELS:
+        cv2.putText(overlay, label, (10, y_offset),
+                   INFO_PANEL_FONT, INFO_PANEL_SCALE, (255, 255, 255), INFO_PANEL_THICKNESS)
+        y_offset += INFO_PANEL_STEP
+    return overlay, values_x
+
+
+# Байт на пиксель для упакованных форматов, доступных без копирования
+_PACKED_FORMAT_CHANNELS = {'RGB': 3, 'BGR': 3, 'YUY2': 2, 'YUYV': 2, 'UYVY': 2}
+
+
+class _GstMapInfo(ctypes.Structure):
+    """Раскладка GstMapInfo из gst/gstmemory.h."""
+    _fields_ = [
+        ('memory', ctypes.c_void_p),
+        ('flags', ctypes.c_int),
+        ('data', ctypes.POINTER(ctypes.c_uint8)),
+        ('size', ctypes.c_size_t),
+        ('maxsize', ctypes.c_size_t),
+        ('user_data', ctypes.c_void_p * 4),
+        ('_gst_reserved', ctypes.c_void_p * 4),
+    ]
+
+
+_GST_MAP_READ = 1
+
+
+def _load_libgst():
+    """libgstreamer-1.0 для прямого gst_buffer_map; None если библиотека не найдена."""
+    name = ctypes.util.find_library('gstreamer-1.0') or 'libgstreamer-1.0.so.0'
+    try:
+        lib = ctypes.CDLL(name)
+    except OSError:
+        return None
+    lib.gst_buffer_map.argtypes = [ctypes.c_void_p, ctypes.POINTER(_GstMapInfo), ctypes.c_int]
+    lib.gst_buffer_map.restype = ctypes.c_int
+    lib.gst_buffer_unmap.argtypes = [ctypes.c_void_p, ctypes.POINTER(_GstMapInfo)]
+    lib.gst_buffer_unmap.restype = None
+    return lib
+
+
+_libgst = _load_libgst()
+
+
+@contextmanager
+def map_buffer(buffer: "Gst.Buffer", format_str: str, width: int, height: int):
+    """
+    Кадр GstBuffer как numpy-массив без копирования (только чтение).
+
+    gst_buffer_map вызывается напрямую через ctypes: buffer.map() из PyGObject
+    может отдавать data копией. Массив действителен только внутри блока with,
+    после выхода буфер освобождается (gst_buffer_unmap). Для форматов без
+    плотной упаковки используется копирующий get_numpy_from_buffer.
+    """
+    channels = _PACKED_FORMAT_CHANNELS.get(format_str)
+    if channels is None or _libgst is None:
+        yield get_numpy_from_buffer(buffer, format_str, width, height)
+        return
+
+    # hash() boxed-обертки PyGObject - адрес GstBuffer
+    buffer_ptr = hash(buffer)
+    map_info = _GstMapInfo()
+    if not _libgst.gst_buffer_map(buffer_ptr, ctypes.byref(map_info), _GST_MAP_READ):
+        yield get_numpy_from_buffer(buffer, format_str, width, height)
+        return
+
     try:
-        caps_str = caps.to_string()
+        if map_info.size == width * height * channels:
+            frame = np.ctypeslib.as_array(map_info.data, shape=(height, width, channels))
+            frame.flags.writeable = False
+            yield frame
+        else:
+            # Строки с выравниванием (stride) - копирующий путь
+            yield get_numpy_from_buffer(buffer, format_str, width, height)
+    finally:
+        _libgst.gst_buffer_unmap(buffer_ptr, ctypes.byref(map_info))
+
+
+def _rescale_boxes_numpy(boxes: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Нормализованные bbox (N, 4: x1, y1, x2, y2) в пиксели int32."""
+    return (boxes * np.array([width, height, width, height], dtype=np.float32)).astype(np.int32)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, nogil=True, fastmath=True)
+    def rescale_boxes(boxes, width, height):
+        """Нормализованные bbox (N, 4: x1, y1, x2, y2) в пиксели int32 за один проход."""
+        out = np.empty(boxes.shape, np.int32)
+        for i in range(boxes.shape[0]):
+            out[i, 0] = int(boxes[i, 0] * width)
+            out[i, 1] = int(boxes[i, 1] * height)
+            out[i, 2] = int(boxes[i, 2] * width)
+            out[i, 3] = int(boxes[i, 3] * height)
+        return out
+else:
+    rescale_boxes = _rescale_boxes_numpy
 
-        # Парсинг через регулярные выражения (без отладочных print)
-        format_match = re.search(r'format=\(string\)"([^"]+)"', caps_str)
-        if not format_match:
-            format_match = re.search(r'format="([^"]+)"', caps_str)
 
-        format_str = format_match.group(1) if format_match else "RGB"
+@dataclass(frozen=True, slots=True)
+class Detections:
+    """Отфильтрованные детекции кадра по столбцам (Struct-of-Arrays)."""
+    labels: list             # Метки классов, N строк
+    confidence: np.ndarray   # (N,) float32
+    xyxy: np.ndarray         # (N, 4) float32: нормализованные x1, y1, x2, y2
 
-        # Ищем ширину и высоту
-        width_match = re.search(r'width=\(int\)(\d+)', caps_str)
-        height_match = re.search(r'height=\(int\)(\d+)', caps_str)
+    def __len__(self):
+        return len(self.labels)
 
-        width = int(width_match.group(1)) if width_match else 1280
-        height = int(height_match.group(1)) if height_match else 720
 
-        return format_str, width, height
+EMPTY_DETECTIONS = Detections([], np.empty(0, dtype=np.float32), np.empty((0, 4), dtype=np.float32))
 
-    except Exception as e:
-        # Тихая обработка ошибок без вывода в консоль
-        pass
 
-    # Возвращаем значения по умолчанию
-    return "RGB", 1280, 720
+# Коды cv2.cvtColor для перевода кадра в BGR (для записи через cv2.imwrite)
+_TO_BGR_CODES = {
+    'RGB': cv2.COLOR_RGB2BGR,
+    'YUY2': cv2.COLOR_YUV2BGR_YUY2,
+    'YUYV': cv2.COLOR_YUV2BGR_YUY2,
+    'UYVY': cv2.COLOR_YUV2BGR_UYVY,
+}
+
+
+def yuv422_to_planar(frame: np.ndarray, format_str: str) -> np.ndarray:
+    """Разделение упакованного YUYV/UYVY кадра (h, w, 2) на плоскости Y, U, V (4:2:2)."""
+    y_index = 1 if format_str == 'UYVY' else 0
+    height = frame.shape[0]
+    luma = frame[:, :, y_index]
+    # Хрома чередуется U, V по парам пикселей
+    chroma = frame[:, :, 1 - y_index].reshape(height, -1, 2)
+    return np.concatenate((luma.ravel(), chroma[:, :, 0].ravel(), chroma[:, :, 1].ravel()))
+
+
+@functools.lru_cache(maxsize=None)
+def run_tool(*args: str) -> tuple[int, str]:
+    """Однократный запуск внешней утилиты (версии и т.п.), результат кэшируется на время процесса."""
+    import subprocess
+    result = subprocess.run(args, capture_output=True, text=True, timeout=5)
+    return result.returncode, result.stdout
+
+
+def list_installed_packages(limit: int = 10) -> list[str]:
+    """Первые пакеты текущего интерпретатора в формате name==version, без запуска pip."""
+    from importlib.metadata import distributions
+    packages = {dist.metadata['Name']: dist.version for dist in distributions()
+                if dist.metadata['Name']}
+    return [f"{name}=={packages[name]}" for name in sorted(packages, key=str.lower)[:limit]]
+
+
+def _noop(*args, **kwargs):
+    """Заглушка для отключенных методов логирования."""
+    pass
 
 
 # ==============================================================================
@@ -73,6 +336,8 @@ def get_caps_info(caps):
 class ConfigManager:
     """Менеджер конфигурации YAML."""
     def __init__(self, config_path=None):
+        self.config_path = None
+        self.config_mtime = None
         self.config = self.load_config(config_path)
         print("✅ Конфигурация v5.5 загружена")
 
@@ -80,16 +345,40 @@ class ConfigManager:
         if config_path is None:
             current_dir = Path(__file__).resolve().parent
             config_path = current_dir / "bird_counter_config_v5.yaml"
+        self.config_path = config_path
 
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+            config = self.read_config_file(config_path)
             print(f"📄 Конфигурация загружена из: {config_path}")
             return config
         except Exception as e:
             print(f"❌ Ошибка загрузки конфигурации: {e}")
             return self.get_default_config()
 
+    def read_config_file(self, config_path):
+        """Разбор YAML (CSafeLoader, если доступен) с запоминанием времени изменения файла."""
+        config_path = Path(config_path)
+        mtime = os.path.getmtime(config_path)
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = yaml.load(f, Loader=YamlSafeLoader)
+        self.config_mtime = mtime
+        return config
+
+    def reload_if_changed(self):
+        """Повторный разбор YAML только если файл изменился (по mtime)."""
+        try:
+            if os.path.getmtime(self.config_path) == self.config_mtime:
+                return False
+            config = self.read_config_file(self.config_path)
+        except (OSError, yaml.YAMLError) as e:
+            print(f"❌ Ошибка перезагрузки конфигурации: {e}")
+            return False
+
+        # Атомарная замена ссылки: читатели видят либо старый, либо новый словарь
+        self.config = config
+        print(f"🔄 Конфигурация перезагружена из: {self.config_path}")
+        return True
+
     def get_default_config(self):
         return {
             'bird_tracking': {
@@ -108,21 +397,47 @@ class ConfigManager:
             'web_streams': {'camera_stream_port': 8080, 'detection_stream_port': 8091}
         }
 
+@dataclass(frozen=True, slots=True)
+class TrackerCfg:
+    """Неизменяемый снимок параметров bird_tracking."""
+    enable_tracking: bool
+    enable_visit_counter: bool
+    bird_timeout: float
+    min_time_between_visits: float
+    # Интервалы в наносекундах монотонных часов: целочисленное сравнение
+    # и независимость от перевода системного времени
+    bird_timeout_ns: int
+    min_visit_ns: int
+
+    @classmethod
+    def from_config(cls, config):
+        tracking = config['bird_tracking']
+        bird_timeout = tracking['bird_timeout_seconds']
+        min_time_between_visits = tracking.get('min_time_between_visits_seconds', 10)
+        return cls(
+            enable_tracking=tracking['enable_tracking'],
+            enable_visit_counter=tracking.get('enable_visit_counter', True),
+            bird_timeout=bird_timeout,
+            min_time_between_visits=min_time_between_visits,
+            bird_timeout_ns=int(bird_timeout * 1_000_000_000),
+            min_visit_ns=int(min_time_between_visits * 1_000_000_000),
+        )
+
+
 class BirdTracker:
     """Умный трекер уникальных птиц и посещений кормушки."""
     def __init__(self, config):
         self.config = config
-        self.enable_tracking = config['bird_tracking']['enable_tracking']
-        self.enable_visit_counter = config['bird_tracking'].get('enable_visit_counter', True)
-        self.bird_timeout = config['bird_tracking']['bird_timeout_seconds']
-        self.min_time_between_visits = config['bird_tracking'].get('min_time_between_visits_seconds', 10)
+        self.cfg = TrackerCfg.from_config(config)
 
         # Состояние трекинга
-        self.active_birds = {}  # {bird_id: last_seen_time}
+        self.active_birds = {}  # {bird_id: last_seen_ns}
+        self._expiry_heap = []  # (last_seen_ns, bird_id); устаревшие записи отбрасываются лениво
         self.total_unique_birds = 0  # Уникальные птицы за сессию
         self.total_feeding_visits = 0  # Посещения кормушки (инциденты кормления)
         self.last_birds_on_frame = 0  # Для логики посещений
-        self.last_bird_absence_time = 0  # Время последнего исчезновения птицы
+        self.last_bird_absence_time = 0  # Время последнего исчезновения птицы (для статистики)
+        self._last_absence_ns = None  # То же по монотонным часам; None - птицы еще не исчезали
 
         # Новое в v5.4: предыдущие значения для отслеживания изменений
         self.prev_total_unique = 0
@@ -130,99 +445,127 @@ class BirdTracker:
         self.new_visit_happened = False  # Флаг нового посещения для логирования
 
         print("🐦 BirdTracker v5.5 инициализирован")
-        print(f"   - Трекинг уникальных: {'включен' if self.enable_tracking else 'выключен'}")
-        print(f"   - Подсчет посещений: {'включен' if self.enable_visit_counter else 'выключен'}")
-        print(f"   - Таймаут птиц: {self.bird_timeout} сек")
-        print(f"   - Мин. время между посещениями: {self.min_time_between_visits} сек")
+        print(f"   - Трекинг уникальных: {'включен' if self.cfg.enable_tracking else 'выключен'}")
+        print(f"   - Подсчет посещений: {'включен' if self.cfg.enable_visit_counter else 'выключен'}")
+        print(f"   - Таймаут птиц: {self.cfg.bird_timeout} сек")
+        print(f"   - Мин. время между посещениями: {self.cfg.min_time_between_visits} сек")
 
-    def update_feeding_visits(self, birds_on_frame, current_time, console_mode='all'):
+    # События посещений, которые печатаются только в режиме консоли 'all'
+    VERBOSE_VISIT_EVENTS = frozenset(('continued', 'gone'))
+
+    def update_feeding_visits(self, birds_on_frame, current_time, console_mode='all', now_ns=None):
         """
         Улучшенная логика подсчета посещений - учитывает "мигание" детектора.
         Сообщения в консоль зависят от режима console_mode.
+        current_time - время для вывода, now_ns - time.monotonic_ns() для интервалов.
         """
-        if not self.enable_visit_counter:
+        if not self.cfg.enable_visit_counter:
             return
 
         # Сбрасываем флаг нового посещения
         self.new_visit_happened = False
+        last_birds_on_frame = self.last_birds_on_frame
+        time_since_absence = 0.0
+        event = None
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
 
-        # Если птица появилась в кадре
         if birds_on_frame > 0:
-            # Если ранее птиц не было (last_birds_on_frame == 0)
-            if self.last_birds_on_frame == 0:
-                # Проверяем, прошло ли достаточно времени с момента последнего исчезновения
-                if self.last_bird_absence_time == 0:
+            # Птица появилась в кадре, ранее птиц не было
+            if last_birds_on_frame == 0:
+                if self._last_absence_ns is None:
                     # Первое посещение в сессии
-                    self.total_feeding_visits += 1
-                    self.new_visit_happened = True
-                    if console_mode in ['all', 'changes_only']:
-                        print(f"🐦 Первое посещение кормушки #{self.total_feeding_visits}")
-                        print(f"   Время: {datetime.fromtimestamp(current_time).strftime('%H:%M:%S')}")
+                    event = 'first'
                 else:
-                    # Прошло ли достаточно времени?
-                    time_since_absence = current_time - self.last_bird_absence_time
-                    if time_since_absence >= self.min_time_between_visits:
-                        # Достаточно долго не было птиц - новое посещение
-                        self.total_feeding_visits += 1
-                        self.new_visit_happened = True
-                        if console_mode in ['all', 'changes_only']:
-                            print(f"🐦 Новое посещение кормушки #{self.total_feeding_visits}")
-                            print(f"   Прошло времени: {time_since_absence:.1f} сек")
-                            print(f"   Время: {datetime.fromtimestamp(current_time).strftime('%H:%M:%S')}")
+                    # Достаточно долго не было птиц - новое посещение,
+                    # иначе продолжение предыдущего ("мигание" детектора)
+                    absence_ns = now_ns - self._last_absence_ns
+                    if absence_ns >= self.cfg.min_visit_ns:
+                        event = 'new'
+                        time_since_absence = absence_ns / 1_000_000_000
                     else:
-                        # Недостаточно времени - это продолжение предыдущего посещения
-                        if console_mode == 'all':
-                            print(f"🐦 Продолжение посещения #{self.total_feeding_visits} (мигание детектора)")
+                        event = 'continued'
             # Если птиц стало больше (групповое кормление)
-            elif birds_on_frame > self.last_birds_on_frame and birds_on_frame > 1:
-                self.total_feeding_visits += 1
-                self.new_visit_happened = True
-                if console_mode in ['all', 'changes_only']:
-                    print(f"🐦 Групповое посещение кормушки #{self.total_feeding_visits}")
-                    print(f"   Птиц в группе: {birds_on_frame}")
+            elif birds_on_frame > last_birds_on_frame and birds_on_frame > 1:
+                event = 'group'
 
         # Если птиц не стало - фиксируем время исчезновения
-        elif birds_on_frame == 0 and self.last_birds_on_frame > 0:
+        elif last_birds_on_frame > 0:
             self.last_bird_absence_time = current_time
-            if console_mode == 'all':
-                print(f"🐦 Птицы исчезли из кадра (время: {datetime.fromtimestamp(current_time).strftime('%H:%M:%S')})")
+            self._last_absence_ns = now_ns
+            event = 'gone'
 
         self.last_birds_on_frame = birds_on_frame
+        if event is None:
+            return
 
-    def update_birds(self, detections, current_time, console_mode='all'):
-        """Обновление состояния птиц с правильной логикой."""
+        if event in ('first', 'new', 'group'):
+            self.total_feeding_visits += 1
+            self.new_visit_happened = True
+
+        # Строки формируются только если сообщение действительно будет напечатано
+        if console_mode == 'all' or (console_mode == 'changes_only'
+                                     and event not in self.VERBOSE_VISIT_EVENTS):
+            self.print_visit_event(event, birds_on_frame, current_time, time_since_absence)
+
+    def print_visit_event(self, event, birds_on_frame, current_time, time_since_absence):
+        """Вывод сообщения о событии посещения в консоль."""
+        visit = self.total_feeding_visits
+        if event == 'first':
+            print(f"🐦 Первое посещение кормушки #{visit}")
+            print(f"   Время: {get_wall_clock(current_time).time}")
+        elif event == 'new':
+            print(f"🐦 Новое посещение кормушки #{visit}")
+            print(f"   Прошло времени: {time_since_absence:.1f} сек")
+            print(f"   Время: {get_wall_clock(current_time).time}")
+        elif event == 'continued':
+            print(f"🐦 Продолжение посещения #{visit} (мигание детектора)")
+        elif event == 'group':
+            print(f"🐦 Групповое посещение кормушки #{visit}")
+            print(f"   Птиц в группе: {birds_on_frame}")
+        elif event == 'gone':
+            print(f"🐦 Птицы исчезли из кадра (время: {get_wall_clock(current_time).time})")
+
+    def update_birds(self, detections, current_time, console_mode='all', now_ns=None):
+        """Обновление состояния птиц с правильной логикой (now_ns - time.monotonic_ns())."""
         birds_on_frame = len(detections)
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
 
         # Сначала обновляем счетчик посещений
-        self.update_feeding_visits(birds_on_frame, current_time, console_mode)
+        self.update_feeding_visits(birds_on_frame, current_time, console_mode, now_ns)
 
-        if not self.enable_tracking:
+        if not self.cfg.enable_tracking:
             self.current_birds_on_frame = birds_on_frame
             return birds_on_frame, 0
 
-        # Удаление устаревших птиц
-        expired_birds = []
-        for bird_id, last_seen in self.active_birds.items():
-            if current_time - last_seen > self.bird_timeout:
-                expired_birds.append(bird_id)
-
-        for bird_id in expired_birds:
-            del self.active_birds[bird_id]
+        # Удаление устаревших птиц: извлекаем из кучи только истекшие записи.
+        # Запись актуальна, если ее время совпадает с last_seen птицы
+        active = self.active_birds
+        expiry_heap = self._expiry_heap
+        deadline = now_ns - self.cfg.bird_timeout_ns
+        while expiry_heap and expiry_heap[0][0] < deadline:
+            last_seen, bird_id = heapq.heappop(expiry_heap)
+            if active.get(bird_id) == last_seen:
+                del active[bird_id]
 
         # Обработка текущих детекций
         new_birds = 0
 
-        for detection in detections:
-            if not self.active_birds:
+        for _ in range(birds_on_frame):
+            if not active:
                 # Первая птица
                 self.total_unique_birds += 1
                 bird_id = f"bird_{self.total_unique_birds}"
-                self.active_birds[bird_id] = current_time
+                active[bird_id] = now_ns
+                heapq.heappush(expiry_heap, (now_ns, bird_id))
                 new_birds += 1
             else:
-                # Обновляем существующую птицу
-                existing_bird = list(self.active_birds.keys())[0]
-                self.active_birds[existing_bird] = current_time
+                # Обновляем существующую птицу (первый ключ без копирования ключей в список)
+                existing_bird = next(iter(active))
+                if active[existing_bird] != now_ns:
+                    active[existing_bird] = now_ns
+                    heapq.heappush(expiry_heap, (now_ns, existing_bird))
 
         self.current_birds_on_frame = birds_on_frame
         return birds_on_frame, new_birds
@@ -236,49 +579,175 @@ class BirdTracker:
             'last_absence_time': self.last_bird_absence_time
         }
 
-    def has_changes(self):
-        """Проверяет, изменились ли счетчики с последнего вызова."""
-        current_stats = self.get_stats()
-        changed = (current_stats['total_unique'] != self.prev_total_unique or
-                  current_stats['total_feeding_visits'] != self.prev_total_feeding_visits)
+    def consume_changes(self):
+        """
+        Изменения счетчиков с последнего вызова: (новое посещение, новая уникальная птица).
+        Вызывается один раз за кадр - повторный вызов вернет (False, False).
+        """
+        visits_changed = self.total_feeding_visits != self.prev_total_feeding_visits
+        unique_changed = self.total_unique_birds != self.prev_total_unique
 
         # Обновляем предыдущие значения
-        self.prev_total_unique = current_stats['total_unique']
-        self.prev_total_feeding_visits = current_stats['total_feeding_visits']
+        self.prev_total_unique = self.total_unique_birds
+        self.prev_total_feeding_visits = self.total_feeding_visits
+
+        return visits_changed, unique_changed
+
+
+# Датчик температуры процессора Raspberry Pi (миллиградусы Цельсия)
+THERMAL_ZONE_PATH = '/sys/class/thermal/thermal_zone0/temp'
+
+# Бинарный лог детекций (logging.binary_mode): заголовок записи - время, птиц на кадре,
+# активных, уникальных, посещений, число координат; далее пары (x, y)
+DETECTION_RECORD = struct.Struct('=dHHIIH')
+DETECTION_COORD = struct.Struct('=ff')
+
+# Координаты детекции в таблицах логов (%-форматирование быстрее f-строки для чисел)
+COORD_TEMPLATE = "bird: (%.2f,%.2f)"
+
+# Поле счетчика уникальных птиц в заголовке лога: фиксированная ширина для перезаписи на месте
+TOTAL_COUNT_LABEL = "**Общее количество уникальных птиц:** "
+TOTAL_COUNT_WIDTH = 10
+
+
+class LogWriter:
+    """
+    Постоянно открытый лог с буферизацией записи и периодическим сбросом на диск.
+    Сброс по времени выполняет flush_if_due: его вызывает поток записи логов,
+    в том числе когда новых строк нет, - строки не задерживаются в буфере дольше FLUSH_INTERVAL.
+    """
+    FLUSH_LINES = 50        # Сброс после N строк
+    FLUSH_INTERVAL = 2.0    # или через T секунд после первой несброшенной строки
+
+    def __init__(self, path, buffer_size, binary=False, log_queue=None):
+        self.path = path
+        if binary:
+            self.file = open(path, 'ab', buffering=buffer_size)
+        else:
+            self.file = open(path, 'a', encoding='utf-8', buffering=buffer_size)
+        self.pending_lines = 0
+        self.last_flush = time.monotonic()
+        # Очередь фонового потока записи; None - запись сразу в вызывающем потоке
+        self.log_queue = log_queue
+
+    def write(self, text):
+        if self.log_queue is not None:
+            self.log_queue.put((self, text))
+        elif not self.file.closed:
+            # После close_logs (завершение по сигналу) поздние строки отбрасываются
+            self.write_now(text)
+
+    def write_now(self, text):
+        if self.pending_lines == 0:
+            # Отсчет интервала - от первой строки, ожидающей сброса
+            self.last_flush = time.monotonic()
+        self.file.write(text)
+        self.pending_lines += 1
+
+        if self.pending_lines >= self.FLUSH_LINES:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self, now=None):
+        """Сброс несброшенных строк, если с первой из них прошло FLUSH_INTERVAL."""
+        if self.pending_lines == 0:
+            return
+        if now is None:
+            now = time.monotonic()
+        if now - self.last_flush >= self.FLUSH_INTERVAL:
+            self.flush(now)
+
+    def flush(self, now=None):
+        self.file.flush()
+        self.pending_lines = 0
+        self.last_flush = time.monotonic() if now is None else now
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+@dataclass(frozen=True, slots=True)
+class LogCfg:
+    """Неизменяемый снимок параметров логирования (logging, system_monitoring, performance_debug, startup_diagnostics)."""
+    enable_text_log: bool
+    log_format: str
+    console_output_mode: str
+    write_buffer_bytes: int     # Размер буфера записи логов (байт)
+    binary_mode: bool           # Бинарный лог детекций, markdown - при завершении
+    enable_temperature_logging: bool
+    temperature_log_interval: float  # в секундах
+    enable_performance_log: bool
+    enable_startup_log: bool
+
+    @classmethod
+    def from_config(cls, config):
+        logging_cfg = config['logging']
+        return cls(
+            enable_text_log=logging_cfg['enable_text_log'],
+            log_format=logging_cfg['log_format'],
+            console_output_mode=logging_cfg.get('console_output_mode', 'all'),
+            write_buffer_bytes=logging_cfg.get('write_buffer_bytes', 65536),
+            binary_mode=logging_cfg.get('binary_mode', False),
+            enable_temperature_logging=config['system_monitoring']['enable_temperature_logging'],
+            temperature_log_interval=config['system_monitoring']['temperature_log_interval_minutes'] * 60,
+            enable_performance_log=config['performance_debug']['enable_performance_log'],
+            enable_startup_log=config['startup_diagnostics']['enable_startup_log'],
+        )
 
-        return changed
 
 class LogManager:
     """Менеджер логирования с организацией структуры и дополнительным логом событий."""
+    TELEMETRY_INTERVAL = 1.0  # Опрос температуры и памяти фоновым потоком - раз в секунду
+    THERMAL_RETRY_INTERVAL = 60.0  # Повторная попытка чтения датчика после ошибки (сек)
+    LOG_BATCH_SIZE = 64     # Строк за один проход фонового потока записи
+
     def __init__(self, config):
         self.config = config
-        self.enable_text_log = config['logging']['enable_text_log']
-        self.log_format = config['logging']['log_format']
-        self.console_output_mode = config['logging'].get('console_output_mode', 'all')
+        self.cfg = LogCfg.from_config(config)
 
-        # Параметры мониторинга температуры
-        self.enable_temperature_logging = config['system_monitoring']['enable_temperature_logging']
-        self.temperature_log_interval = config['system_monitoring']['temperature_log_interval_minutes'] * 60  # в секунды
+        # Файлы логов открываются один раз на сессию
+        self.log_writers = []
+        self.log_queue = None
+        self.log_thread = None
 
-        # Параметры отладки производительности
-        self.enable_performance_log = config['performance_debug']['enable_performance_log']
+        # Бинарный лог детекций: строки markdown формируются один раз при завершении
+        self.binary_log = None
 
-        # Параметры диагностики запуска
-        self.enable_startup_log = config['startup_diagnostics']['enable_startup_log']
+        # Телеметрия: значения обновляет фоновый поток, в потоке кадров - только чтение атрибутов
+        self._thermal_fd = None          # None - не открыт, -1 - датчика нет
+        self._thermal_retry_at = 0.0     # time.monotonic() следующей попытки после ошибки
+        self._thermal_warned = False     # Предупреждение об ошибке уже выведено
+        self.cpu_temperature = None  # °C или None, если датчик недоступен
+        self.used_memory = 0.0       # MB
 
-        if self.enable_text_log:
+        if self.cfg.enable_text_log:
             self.setup_logging()
             print("📝 LogManager v5.5 инициализирован")
-            print(f"   - Режим консоли: {self.console_output_mode}")
+            print(f"   - Режим консоли: {self.cfg.console_output_mode}")
             print(f"   - Лог v5.1: {self.log_file_path}")
-            print(f"   - Лог v2.0: {self.add_logs_dir / 'bird_counter_log.md'}")
+            print(f"   - Лог v2.0: {self.log_v2_path}")
             print(f"   - Лог событий: {self.events_log_path}")
 
             # Инициализация лога температуры
-            if self.enable_temperature_logging:
+            if self.cfg.enable_temperature_logging:
                 self.setup_temperature_logging(self.config)
                 print(f"   - Лог температуры: {self.temperature_log_path}")
-                print(f"   - Интервал температуры: {self.temperature_log_interval} сек")
+                print(f"   - Интервал температуры: {self.cfg.temperature_log_interval} сек")
+
+        # Методы записи связываются один раз: отключенный лог - пустая заглушка без проверок
+        text_log = self.cfg.enable_text_log
+        if not text_log:
+            self.log_detection = _noop
+        elif self.cfg.binary_mode:
+            self.log_detection = self._log_detection_binary_impl
+        else:
+            self.log_detection = self._log_detection_impl
+        self.log_counter_event = self._log_counter_event_impl if text_log else _noop
+        self.log_performance_debug = (self._log_performance_debug_impl
+                                      if text_log and self.cfg.enable_performance_log else _noop)
+        self.log_temperature = (self._log_temperature_impl
+                                if text_log and self.cfg.enable_temperature_logging else _noop)
 
     def setup_logging(self):
         """Создание структуры логирования с организацией."""
@@ -298,12 +767,19 @@ class LogManager:
         filename_pattern = self.config['logging']['log_filename_pattern']
         filename = filename_pattern.format(timestamp=timestamp)
         self.log_file_path = self.session_folder / filename  # Основной лог v5.1
+        self.log_v2_path = self.add_logs_dir / "bird_counter_log.md"  # Классический v2.0
+        # Строковые пути для частых открытий файла (без операций Path на каждый вызов)
+        self._log_file_path_str = str(self.log_file_path)
+        self._log_v2_path_str = str(self.log_v2_path)
 
         # Дополнительный лог событий изменения счетчика (в add_logs)
         self.events_log_path = self.add_logs_dir / f"bird_counter_events_{timestamp}.md"
 
+        # Бинарный лог детекций (в add_logs)
+        self.binary_log_path = self.add_logs_dir / f"bird_detections_{timestamp}.bin"
+
         # Отладочный лог производительности (в add_logs)
-        if self.enable_performance_log:
+        if self.cfg.enable_performance_log:
             performance_filename = self.config['performance_debug']['performance_log_filename']
             self.performance_log_path = self.add_logs_dir / performance_filename.format(timestamp=timestamp)
 
@@ -313,15 +789,127 @@ class LogManager:
         self.init_events_log()      # Лог событий
 
         # Инициализация отладочного лога производительности
-        if self.enable_performance_log:
+        if self.cfg.enable_performance_log:
             self.init_performance_debug_log()
 
+        # Постоянные буферизованные дескрипторы для дописывания строк;
+        # сама запись выполняется фоновым потоком
+        self.start_log_thread()
+        self.main_log = self.open_log_writer(self.log_file_path)
+        self.log_v2 = self.open_log_writer(self.log_v2_path)
+        self.events_log = self.open_log_writer(self.events_log_path)
+        self.bind_detection_writer()
+        if self.cfg.enable_performance_log:
+            self.performance_log = self.open_log_writer(self.performance_log_path)
+        if self.cfg.binary_mode:
+            self.binary_log = LogWriter(self.binary_log_path, self.cfg.write_buffer_bytes,
+                                        binary=True, log_queue=self.log_queue)
+        atexit.register(self.close_logs)
+        self.install_termination_handlers()
+
         # Определение способа запуска и создание лога диагностики
+        self._launch_method = None
         self.launch_method = self.detect_launch_method()
-        if self.enable_startup_log:
+        if self.cfg.enable_startup_log:
             self.init_startup_diagnostics_log()
             self.log_startup_diagnostics()
 
+    def open_log_writer(self, path):
+        """Открытие лога на дописывание с буфером write_buffer_bytes."""
+        writer = LogWriter(path, self.cfg.write_buffer_bytes, log_queue=self.log_queue)
+        self.log_writers.append(writer)
+        return writer
+
+    def start_log_thread(self):
+        """Запуск фонового потока записи: поток кадров только кладет строку в очередь."""
+        self.log_queue = queue.SimpleQueue()
+        self.log_thread = threading.Thread(target=self.drain_log_queue, daemon=True)
+        self.log_thread.start()
+
+    def drain_log_queue(self):
+        """
+        Запись строк из очереди пачками; None в очереди - сигнал остановки.
+        Ожидание ограничено FLUSH_INTERVAL: в паузах без новых строк
+        несброшенные буферы все равно попадают на диск.
+        """
+        log_queue = self.log_queue
+        while True:
+            try:
+                batch = [log_queue.get(timeout=LogWriter.FLUSH_INTERVAL)]
+            except queue.Empty:
+                self.flush_due_writers()
+                continue
+            while len(batch) < self.LOG_BATCH_SIZE:
+                try:
+                    batch.append(log_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for item in batch:
+                if item is None:
+                    return
+                writer, text = item
+                try:
+                    writer.write_now(text)
+                except (OSError, ValueError) as e:
+                    print(f"❌ Ошибка записи лога {writer.path}: {e}")
+            self.flush_due_writers()
+
+    def flush_due_writers(self):
+        """Сброс логов, у которых строки ждут в буфере дольше FLUSH_INTERVAL."""
+        now = time.monotonic()
+        writers = list(self.log_writers)
+        if self.binary_log is not None:
+            writers.append(self.binary_log)
+        for writer in writers:
+            try:
+                writer.flush_if_due(now)
+            except (OSError, ValueError) as e:
+                print(f"❌ Ошибка сброса лога {writer.path}: {e}")
+
+    def stop_log_thread(self):
+        """Дописывание оставшихся в очереди строк и переход на прямую запись."""
+        if self.log_thread is None:
+            return
+        self.log_queue.put(None)
+        self.log_thread.join(timeout=5.0)
+        self.log_thread = None
+        for writer in self.log_writers:
+            writer.log_queue = None
+        if self.binary_log is not None:
+            self.binary_log.log_queue = None
+
+    def install_termination_handlers(self):
+        """
+        SIGTERM (systemd stop) и SIGHUP (Ctrl+A, K в screen) по умолчанию завершают
+        процесс без atexit - буферизованные строки логов были бы потеряны.
+        Обработчик сбрасывает и закрывает логи и завершает процесс через SystemExit.
+        """
+        for signum in (signal.SIGTERM, getattr(signal, 'SIGHUP', None)):
+            if signum is None:
+                continue
+            try:
+                signal.signal(signum, self.handle_termination_signal)
+            except ValueError:
+                # signal.signal доступен только из главного потока
+                print(f"⚠️ Не удалось установить обработчик {signal.Signals(signum).name}")
+
+    def handle_termination_signal(self, signum, frame):
+        """Завершение по сигналу: логи закрываются сразу (исключение из обработчика
+        может быть перехвачено главным циклом GLib), затем SystemExit."""
+        print(f"\n🛑 Получен сигнал {signal.Signals(signum).name}, завершение...")
+        self.close_logs()
+        raise SystemExit(128 + signum)
+
+    def close_logs(self):
+        """Сброс буферов и закрытие всех логов (при завершении процесса)."""
+        self.stop_log_thread()
+        if self.binary_log is not None and not self.binary_log.file.closed:
+            self.binary_log.close()
+            self.render_binary_log()
+        for writer in self.log_writers:
+            writer.close()
+
     def init_performance_debug_log(self):
         """Создание отладочного лога производительности."""
         with open(self.performance_log_path, 'w', encoding='utf-8') as f:
@@ -333,36 +921,38 @@ class LogManager:
             f.write("| Время | FPS | Темп. CPU | Задержка кадра | Память | Комментарий |\n")
             f.write("|-------|-----|-----------|----------------|--------|-------------|\n")
 
-    def log_performance_debug(self, fps, cpu_temp, frame_delay, memory_usage, comment=""):
-        """Логирование отладочной информации о производительности."""
-        if not self.enable_performance_log:
-            return
-
-        time_str = datetime.now().strftime('%H:%M:%S')
-        with open(self.performance_log_path, 'a', encoding='utf-8') as f:
-            f.write(f"| {time_str} | {fps:.1f} | {cpu_temp:.1f} | {frame_delay:.3f} | {memory_usage:.1f} | {comment} |\n")
-
-        # Инициализация лога температуры
-        if self.enable_temperature_logging:
-            self.setup_temperature_logging(self.config)
+    def _log_performance_debug_impl(self, fps, cpu_temp, frame_delay, memory_usage, comment="", timestamp=None):
+        """Логирование отладочной информации о производительности (timestamp - время кадра)."""
+        time_str = get_wall_clock(timestamp).time
+        self.performance_log.write(f"| {time_str} | {fps:.1f} | {cpu_temp:.1f} | {frame_delay:.3f} | {memory_usage:.1f} | {comment} |\n")
 
     def init_log_file(self):
         """Создание структуры основного лога v5.1."""
+        header = ("# Лог детекции птиц v5.5\n\n"
+                  f"**Дата запуска:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                  f"{TOTAL_COUNT_LABEL}")
+        # Смещение поля счетчика в байтах (UTF-8) для update_total_count
+        self.total_count_offset = len(header.encode('utf-8'))
+        self.last_written_total = 0
+
         with open(self.log_file_path, 'w', encoding='utf-8') as f:
-            f.write("# Лог детекции птиц v5.5\n\n")
-            f.write(f"**Дата запуска:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("**Общее количество уникальных птиц:** 0\n\n")
+            f.write(header)
+            f.write(f"{0:<{TOTAL_COUNT_WIDTH}}\n\n")
             f.write("## Статистика детекций\n\n")
             f.write("| Время | Птиц на кадре | Активных | Уникальных | Посещений | Координаты |\n")
             f.write("|-------|---------------|----------|------------|-----------|------------|\n")
 
     def init_log_file_v2(self):
         """Создание структуры лога v2.0 в папке add_logs."""
-        log_v2_path = self.add_logs_dir / "bird_counter_log.md"
-        with open(log_v2_path, 'w', encoding='utf-8') as f:
-            f.write("# Лог подсчета птиц у кормушки v2.0\n\n")
-            f.write(f"**Дата запуска:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("**Общее количество уникальных птиц:** 0\n\n")
+        header = ("# Лог подсчета птиц у кормушки v2.0\n\n"
+                  f"**Дата запуска:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                  f"{TOTAL_COUNT_LABEL}")
+        self.total_count_offset_v2 = len(header.encode('utf-8'))
+        self.last_written_total_v2 = 0
+
+        with open(self.log_v2_path, 'w', encoding='utf-8') as f:
+            f.write(header)
+            f.write(f"{0:<{TOTAL_COUNT_WIDTH}}\n\n")
             f.write("## Статистика по кадрам\n\n")
             f.write("| Время | Кол-во птиц на кадре | Общее уникальных | Координаты обнаружений |\n")
             f.write("|-------|---------------------|------------------|-------------------------|\n")
@@ -374,81 +964,99 @@ class LogManager:
             f.write(f"**Дата запуска:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
             f.write("## События\n\n")
 
-    def log_detection(self, timestamp, birds_on_frame, active_birds, total_unique, total_feeding_visits, detections):
+    def _log_detection_impl(self, current_time, birds_on_frame, active_birds, total_unique, total_feeding_visits, detections):
         """Логирование в основной лог и v2.0."""
-        if not self.enable_text_log:
-            return
-
-        # Обновление заголовка основного лога
+        # Обновление заголовков основного лога и v2.0
         self.update_total_count(total_unique)
+        if detections:
+            self.update_total_count_v2(total_unique)
 
-        # Формирование координат
-        coords_str = "; ".join([
-            f"bird: ({det['x']:.2f},{det['y']:.2f})"
-            for det in detections
-        ])
+        # Формирование координат (левый верхний угол bbox) - один раз для обоих логов
+        coords = [COORD_TEMPLATE % (x, y) for x, y in detections.xyxy[:, :2].tolist()]
 
-        # Лог в основной файл v5.1
-        time_only = timestamp.split('_')[1].replace('-', ':')
-        with open(self.log_file_path, 'a', encoding='utf-8') as f:
-            f.write(f"| {time_only} | {birds_on_frame} | {active_birds} | {total_unique} | {total_feeding_visits} | {coords_str} |\n")
+        self.write_detection_rows(get_wall_clock(current_time).time, birds_on_frame, active_birds,
+                                  total_unique, total_feeding_visits, "; ".join(coords))
 
-        # Лог v2.0 в add_logs/
+    def _log_detection_binary_impl(self, current_time, birds_on_frame, active_birds, total_unique, total_feeding_visits, detections):
+        """Логирование детекций одной бинарной записью; markdown формируется в render_binary_log."""
+        self.update_total_count(total_unique)
         if detections:
-            self.log_detection_v2(timestamp, birds_on_frame, total_unique, detections)
-
-    def log_detection_v2(self, timestamp, birds_on_frame, total_unique, detections):
-        """Логирование в формате v2.0."""
-        # Обновление заголовка v2.0
-        self.update_total_count_v2(total_unique)
-
-        # Формирование координат в формате v2
-        coords_str = "; ".join([
-            f"bird: ({det['x']:.2f},{det['y']:.2f})"
-            for det in detections
-        ])
-
-        # Добавление записи
-        time_only = timestamp.split('_')[1].replace('-', ':')
-        log_v2_path = self.add_logs_dir / "bird_counter_log.md"
-        with open(log_v2_path, 'a', encoding='utf-8') as f:
-            f.write(f"| {time_only} | {birds_on_frame} | {total_unique} | {coords_str} |\n")
-
-    def log_counter_event(self, event_type, counter_value, timestamp):
+            self.update_total_count_v2(total_unique)
+
+        record = DETECTION_RECORD.pack(current_time, birds_on_frame, active_birds,
+                                       total_unique, total_feeding_visits, len(detections))
+        # Столбцы x1, y1 float32 совпадают с раскладкой DETECTION_COORD ('=ff')
+        self.binary_log.write(record + np.ascontiguousarray(detections.xyxy[:, :2]).tobytes())
+
+    def bind_detection_writer(self):
+        """
+        Специализированная запись строк таблиц основного лога v5.1 и (при наличии
+        детекций) лога v2.0: шаблоны и методы write захвачены замыканием,
+        на строку - одно %-форматирование и один вызов write.
+        """
+        main_write = self.main_log.write
+        v2_write = self.log_v2.write
+        main_row = "| %s | %d | %d | %d | %d | %s |\n"
+        v2_row = "| %s | %d | %d | %s |\n"
+
+        def write_detection_rows(time_only, birds_on_frame, active_birds, total_unique, total_feeding_visits, coords_str):
+            main_write(main_row % (time_only, birds_on_frame, active_birds, total_unique, total_feeding_visits, coords_str))
+            if coords_str:
+                v2_write(v2_row % (time_only, birds_on_frame, total_unique, coords_str))
+
+        self.write_detection_rows = write_detection_rows
+
+    def render_binary_log(self):
+        """Потоковое преобразование бинарного лога детекций в таблицы основного лога и v2.0."""
+        record_size = DETECTION_RECORD.size
+        try:
+            with open(self.binary_log_path, 'rb') as f:
+                while True:
+                    header = f.read(record_size)
+                    if len(header) < record_size:
+                        break
+                    (current_time, birds_on_frame, active_birds,
+                     total_unique, total_feeding_visits, n_coords) = DETECTION_RECORD.unpack(header)
+                    coords_raw = f.read(n_coords * DETECTION_COORD.size)
+                    if len(coords_raw) < n_coords * DETECTION_COORD.size:
+                        break  # Обрезанная последняя запись (аварийное завершение)
+                    coords_str = "; ".join([COORD_TEMPLATE % xy
+                                            for xy in DETECTION_COORD.iter_unpack(coords_raw)])
+                    self.write_detection_rows(get_wall_clock(current_time).time, birds_on_frame,
+                                              active_birds, total_unique, total_feeding_visits, coords_str)
+        except OSError as e:
+            print(f"❌ Ошибка преобразования бинарного лога: {e}")
+
+    def _log_counter_event_impl(self, event_type, counter_value, timestamp):
         """Логирование события изменения счетчика."""
-        time_str = datetime.fromtimestamp(timestamp).strftime('%H:%M:%S')
+        time_str = get_wall_clock(timestamp).time
         event_text = f"- **{time_str}**: {event_type} #{counter_value}\n"
 
-        with open(self.events_log_path, 'a', encoding='utf-8') as f:
-            f.write(event_text)
+        self.events_log.write(event_text)
 
     def update_total_count(self, total_unique):
         """Обновление общего количества в заголовке основного лога."""
-        with open(self.log_file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        old_line = "**Общее количество уникальных птиц:** 0"
-        new_line = f"**Общее количество уникальных птиц:** {total_unique}"
-        updated_content = content.replace(old_line, new_line)
-
-        with open(self.log_file_path, 'w', encoding='utf-8') as f:
-            f.write(updated_content)
+        if total_unique == self.last_written_total:
+            return
+        self.write_total_count(self._log_file_path_str, self.total_count_offset, total_unique)
+        self.last_written_total = total_unique
 
     def update_total_count_v2(self, total_unique):
         """Обновление общего количества в заголовке v2.0."""
-        log_v2_path = self.add_logs_dir / "bird_counter_log.md"
-        with open(log_v2_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        old_line = "**Общее количество уникальных птиц:** 0"
-        new_line = f"**Общее количество уникальных птиц:** {total_unique}"
-        updated_content = content.replace(old_line, new_line)
+        if total_unique == self.last_written_total_v2:
+            return
+        self.write_total_count(self._log_v2_path_str, self.total_count_offset_v2, total_unique)
+        self.last_written_total_v2 = total_unique
 
-        with open(log_v2_path, 'w', encoding='utf-8') as f:
-            f.write(updated_content)
+    def write_total_count(self, log_path, offset, total_unique):
+        """Перезапись поля счетчика фиксированной ширины на месте, без чтения файла."""
+        with open(log_path, 'r+b') as f:
+            f.seek(offset)
+            f.write(f"{total_unique:<{TOTAL_COUNT_WIDTH}}".encode('utf-8'))
 
     def setup_temperature_logging(self, system_config):
-        """Инициализация логирования температуры с параметрами системы."""
+        """Инициализация логирования температуры с параметрами системы (один раз за сессию)."""
+        assert getattr(self, 'temperature_log', None) is None, "лог температуры уже инициализирован"
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         filename_pattern = self.config['system_monitoring']['temperature_log_filename']
         filename = filename_pattern.format(timestamp=timestamp)
@@ -468,7 +1076,7 @@ class LogManager:
         with open(self.temperature_log_path, 'w', encoding='utf-8') as f:
             f.write("# Лог температуры процессора и параметров системы\n\n")
             f.write(f"**Дата запуска:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"**Интервал логирования:** каждые {self.temperature_log_interval} секунд\n\n")
+            f.write(f"**Интервал логирования:** каждые {self.cfg.temperature_log_interval} секунд\n\n")
 
             f.write("## Параметры системы (влияют на производительность)\n\n")
             f.write(f"- **Модель Hailo:** {model_name}\n")
@@ -484,24 +1092,86 @@ class LogManager:
             f.write("| Время          | Температура (°C)    | FPS     |\n")
             f.write("|----------------|---------------------|---------|\n")
 
+        self.temperature_log = self.open_log_writer(self.temperature_log_path)
+
+    def start_telemetry_sampler(self):
+        """
+        Первый замер сразу, далее - фоновый поток с периодом TELEMETRY_INTERVAL.
+        Запускается детектором, только если телеметрию есть кому читать.
+        """
+        self.sample_telemetry()
+
+        def telemetry_sampler():
+            while True:
+                time.sleep(self.TELEMETRY_INTERVAL)
+                self.sample_telemetry()
+
+        threading.Thread(target=telemetry_sampler, daemon=True).start()
+
+    def sample_telemetry(self):
+        """Обновление cpu_temperature и used_memory (присваивание атрибута атомарно под GIL)."""
+        self.cpu_temperature = self.get_cpu_temperature()
+        self.used_memory = self.get_used_memory()
+
     def get_cpu_temperature(self):
-        """Получение температуры процессора Raspberry Pi."""
+        """
+        Чтение температуры процессора Raspberry Pi из sysfs.
+        Нет файла датчика - опрос отключается (_thermal_fd = -1). Прочие ошибки
+        считаются временными: дескриптор закрывается, повторная попытка -
+        через THERMAL_RETRY_INTERVAL. Предупреждение выводится один раз.
+        """
+        if self._thermal_fd == -1:
+            return None
         try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                temp_raw = f.read().strip()
+            if self._thermal_fd is None:
+                if time.monotonic() < self._thermal_retry_at:
+                    return None
+                self._thermal_fd = os.open(THERMAL_ZONE_PATH, os.O_RDONLY)
+            # pread с нулевого смещения: sysfs отдает свежее значение без повторного open
+            temp_raw = os.pread(self._thermal_fd, 16, 0)
             # Температура в миллиградусах Цельсия
             temp_celsius = float(temp_raw) / 1000.0
-            return round(temp_celsius, 1)
-        except Exception as e:
-            print(f"⚠️ Ошибка получения температуры: {e}")
+        except FileNotFoundError as e:
+            print(f"⚠️ Датчик температуры недоступен: {e} (опрос отключен)")
+            self._thermal_fd = -1
+            return None
+        except (OSError, ValueError) as e:
+            if not self._thermal_warned:
+                print(f"⚠️ Ошибка получения температуры: {e} "
+                      f"(повтор через {self.THERMAL_RETRY_INTERVAL:.0f} сек)")
+                self._thermal_warned = True
+            if self._thermal_fd is not None:
+                try:
+                    os.close(self._thermal_fd)
+                except OSError:
+                    pass
+                self._thermal_fd = None
+            self._thermal_retry_at = time.monotonic() + self.THERMAL_RETRY_INTERVAL
             return None
 
-    def log_temperature(self, temperature, timestamp, fps=None):
-        """Логирование температуры и FPS в файл с выравниванием колонок."""
-        if not self.enable_temperature_logging:
-            return
+        if self._thermal_warned:
+            print("🌡️ Датчик температуры снова доступен")
+            self._thermal_warned = False
+        return round(temp_celsius, 1)
 
-        time_str = datetime.fromtimestamp(timestamp).strftime('%H:%M:%S')
+    def get_used_memory(self):
+        """Используемая память в MB (MemTotal - MemAvailable) из /proc/meminfo."""
+        try:
+            # MemTotal, MemFree, MemAvailable - первые строки файла
+            with open('/proc/meminfo', 'rb') as f:
+                head = f.read(512)
+            fields = {}
+            for line in head.split(b'\n')[:3]:
+                parts = line.split()
+                if len(parts) >= 2:
+                    fields[parts[0]] = int(parts[1])
+            return (fields[b'MemTotal:'] - fields[b'MemAvailable:']) / 1024
+        except (OSError, ValueError, KeyError):
+            return 0.0
+
+    def _log_temperature_impl(self, temperature, timestamp, fps=None):
+        """Логирование температуры и FPS в файл с выравниванием колонок."""
+        time_str = get_wall_clock(timestamp).time
         # Логируем FPS только если он > 0, иначе "-"
         fps_str = f"{fps:.1f}" if fps and fps > 0 else "-"
 
@@ -510,16 +1180,21 @@ class LogManager:
         temp_col = f"{temperature:<21}"  # 21 символ, выравнивание влево
         fps_col = f"{fps_str:<9}"  # 9 символов, выравнивание влево
 
-        with open(self.temperature_log_path, 'a', encoding='utf-8') as f:
-            f.write(f"| {time_col}| {temp_col}| {fps_col}|\n")
+        self.temperature_log.write(f"| {time_col}| {temp_col}| {fps_col}|\n")
 
     def detect_launch_method(self):
+        """Определение способа запуска приложения (результат кэшируется)."""
+        if self._launch_method is None:
+            self._launch_method = self._detect_launch_method()
+        return self._launch_method
+
+    def _detect_launch_method(self):
         """Определение способа запуска приложения (systemd или console)."""
-        try:
-            # Проверяем переменные окружения systemd
-            if os.getenv('INVOCATION_ID') or os.getenv('NOTIFY_SOCKET'):
-                return "systemd"
+        # Проверяем переменные окружения systemd
+        if os.getenv('INVOCATION_ID') or os.getenv('NOTIFY_SOCKET'):
+            return "systemd"
 
+        try:
             # Проверяем PPID (родительский процесс)
             ppid = os.getppid()
             with open(f'/proc/{ppid}/cmdline', 'r') as f:
@@ -538,8 +1213,8 @@ class LogManager:
 
             return "console"
 
-        except Exception as e:
-            # В случае ошибки возвращаем "unknown"
+        except (OSError, KeyError):
+            # /proc недоступен или uid нет в passwd - возвращаем "unknown"
             return "unknown"
 
     def init_startup_diagnostics_log(self):
@@ -550,9 +1225,13 @@ class LogManager:
 
     def log_startup_diagnostics(self):
         """Логирование диагностической информации о запуске."""
-        if not self.enable_startup_log:
+        if not self.cfg.enable_startup_log:
             return
 
+        # Тяжелые модули нужны только для диагностики
+        import platform
+        import subprocess
+
         with open(self.startup_log_path, 'w', encoding='utf-8') as f:
             f.write("# Диагностика запуска Bird Detector\n\n")
             f.write(f"**Дата запуска:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
@@ -561,13 +1240,12 @@ class LogManager:
             # Системная информация
             f.write("## Системная информация\n\n")
             try:
-                import platform
                 f.write(f"- **ОС:** {platform.system()} {platform.release()}\n")
                 f.write(f"- **Python:** {sys.version.split()[0]}\n")
                 f.write(f"- **Пользователь:** {os.getenv('USER', 'unknown')}\n")
                 f.write(f"- **PID:** {os.getpid()}\n")
                 f.write(f"- **PPID:** {os.getppid()}\n")
-            except:
+            except OSError:
                 f.write("- **Ошибка получения системной информации**\n")
 
             # Переменные окружения
@@ -588,16 +1266,13 @@ class LogManager:
                 f.write(f"- **Путь к venv:** {venv_path}\n")
                 f.write(f"- **Активировано:** Да\n")
 
-                # Проверяем pip list (первые 10 пакетов)
+                # Первые 10 пакетов из метаданных интерпретатора (без pip list)
                 try:
-                    import subprocess
-                    result = subprocess.run([sys.executable, '-m', 'pip', 'list', '--format=freeze'],
-                                          capture_output=True, text=True, timeout=10)
-                    packages = result.stdout.strip().split('\n')[:10]
+                    packages = list_installed_packages(10)
                     f.write("- **Установленные пакеты (первые 10):**\n")
                     for pkg in packages:
                         f.write(f"  - {pkg}\n")
-                except:
+                except OSError:
                     f.write("- **Не удалось получить список пакетов**\n")
             else:
                 f.write("- **Виртуальное окружение не активировано**\n")
@@ -605,24 +1280,21 @@ class LogManager:
             # GStreamer информация
             f.write("\n## GStreamer информация\n\n")
             try:
-                import subprocess
                 # Версия GStreamer
-                gst_ver = subprocess.run(['gst-launch-1.0', '--version'],
-                                       capture_output=True, text=True, timeout=5)
-                if gst_ver.returncode == 0:
-                    version_line = gst_ver.stdout.split('\n')[0]
+                returncode, stdout = run_tool('gst-launch-1.0', '--version')
+                if returncode == 0:
+                    version_line = stdout.split('\n')[0]
                     f.write(f"- **Версия GStreamer:** {version_line}\n")
                 else:
                     f.write("- **GStreamer не найден**\n")
 
                 # Доступные плагины
-                gst_inspect = subprocess.run(['gst-inspect-1.0'],
-                                           capture_output=True, text=True, timeout=5)
-                plugin_count = len([line for line in gst_inspect.stdout.split('\n')
+                _, stdout = run_tool('gst-inspect-1.0')
+                plugin_count = len([line for line in stdout.split('\n')
                                   if line.strip() and not line.startswith('Total')])
                 f.write(f"- **Количество плагинов:** {plugin_count}\n")
 
-            except:
+            except (OSError, subprocess.SubprocessError):
                 f.write("- **Ошибка получения информации о GStreamer**\n")
 
             # Hailo информация
@@ -631,14 +1303,12 @@ class LogManager:
                 import hailo_platform
                 f.write(f"- **Hailo Platform доступен:** Да\n")
                 try:
-                    import subprocess
-                    hailo_ver = subprocess.run(['hailortcli', 'version'],
-                                             capture_output=True, text=True, timeout=5)
-                    if hailo_ver.returncode == 0:
-                        f.write(f"- **HailoRT версия:** {hailo_ver.stdout.strip()}\n")
+                    returncode, stdout = run_tool('hailortcli', 'version')
+                    if returncode == 0:
+                        f.write(f"- **HailoRT версия:** {stdout.strip()}\n")
                     else:
                         f.write("- **hailortcli не найден**\n")
-                except:
+                except (OSError, subprocess.SubprocessError):
                     f.write("- **hailortcli не доступен**\n")
             except ImportError:
                 f.write("- **Hailo Platform не доступен**\n")
@@ -652,6 +1322,108 @@ class LogManager:
 
             f.write("\n---\n*Автоматически сгенерированная диагностика запуска*\n")
 
+class StreamEncoder:
+    """
+    Единственный кодировщик JPEG для стрима: каждый опубликованный кадр
+    кодируется один раз в фоновом потоке в готовую часть MJPEG (заголовок,
+    JPEG, разделитель), HTTP-клиенты ждут ее на условной переменной вместо
+    опроса по таймеру.
+    """
+    def __init__(self, quality, max_fps):
+        self.quality = quality
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.cond = threading.Condition()
+        self.frame = None       # Последний опубликованный StreamFrame
+        self.encoding = None    # StreamFrame, который сейчас кодируется (буфер занят)
+        self.encoded_seq = 0    # seq последнего обработанного кодировщиком кадра
+        self.part = None        # Часть MJPEG для отправки клиентам одним write
+        self.part_seq = 0       # seq кадра, из которого получена self.part
+        self.viewers = 0        # Подключенные HTTP-клиенты; без них кадры стрима не готовятся
+        threading.Thread(target=self.encode_loop, daemon=True).start()
+
+    def add_viewer(self):
+        with self.cond:
+            self.viewers += 1
+
+    def remove_viewer(self):
+        with self.cond:
+            self.viewers -= 1
+
+    def publish(self, frame):
+        """Публикация нового кадра (StreamFrame) для кодирования."""
+        with self.cond:
+            self.frame = frame
+            self.cond.notify_all()
+
+    def busy_images(self):
+        """id буферов, которые нельзя перезаписывать: опубликованный и кодируемый кадры."""
+        with self.cond:
+            return {id(frame.image) for frame in (self.frame, self.encoding) if frame is not None}
+
+    def encode_loop(self):
+        """Фоновый поток: кодирует самый свежий кадр не чаще max_fps раз в секунду."""
+        last_encode = 0.0
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.viewers > 0 and self.frame is not None
+                                   and self.frame.seq != self.encoded_seq)
+
+            delay = last_encode + self.min_interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            last_encode = time.monotonic()
+
+            # После паузы берем самый свежий кадр - промежуточные пропускаются.
+            # Кадр захватывается под блокировкой: до конца кодирования его буфер
+            # не выдается производителю (next_stream_buffer)
+            with self.cond:
+                frame = self.frame
+                self.encoding = frame
+                self.encoded_seq = frame.seq
+            try:
+                if TURBOJPEG_AVAILABLE:
+                    # libjpeg-turbo (NEON SIMD), ctypes-вызов отпускает GIL на время кодирования
+                    jpeg = turbo_jpeg.encode(frame.image, quality=self.quality, pixel_format=TJPF_BGR,
+                                             jpeg_subsample=TJSAMP_420)
+                else:
+                    ok, encoded = cv2.imencode('.jpg', frame.image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+                    if not ok:
+                        continue
+                    jpeg = encoded.tobytes()
+            finally:
+                with self.cond:
+                    self.encoding = None
+
+            part = b''.join((MJPEG_PART_HEADER % len(jpeg), jpeg, b'\r\n'))
+            with self.cond:
+                self.part = part
+                self.part_seq = frame.seq
+                self.cond.notify_all()
+
+    def wait_part(self, last_seq, timeout=None):
+        """Ожидание части MJPEG новее last_seq: (seq, part) или (last_seq, None) по таймауту."""
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.part_seq != last_seq, timeout):
+                return last_seq, None
+            return self.part_seq, self.part
+
+
+class BirdDetectionApp(GStreamerDetectionApp):
+    """
+    GStreamerDetectionApp с размером батча hailonet из конфигурации
+    (hailo_model.batch_size): hailonet отправляет на Hailo по N кадров за
+    вызов, что снижает накладные расходы на многоконтекстных HEF.
+    """
+    def __init__(self, app_callback, user_data, batch_size):
+        self.configured_batch_size = batch_size
+        super().__init__(app_callback, user_data)
+
+    def get_pipeline_string(self):
+        # Базовый класс задает batch_size в __init__ перед построением пайплайна
+        self.batch_size = self.configured_batch_size
+        return super().get_pipeline_string()
+
+
 # ==============================================================================
 # ОСНОВНОЙ КЛАСС BIRD DETECTOR v5.5
 # ==============================================================================
@@ -733,32 +1505,58 @@ class BirdDetectorV55:
             self.enable_camera_stream = True
             self.enable_detection_stream = True
 
+        # Опрос температуры и памяти нужен только логу производительности,
+        # логу температуры и панели стрима с детекцией
+        if (self.log_manager.cfg.enable_performance_log or
+                self.log_manager.cfg.enable_temperature_logging or
+                self.enable_detection_stream):
+            self.log_manager.start_telemetry_sampler()
+
         self.camera_port = self.config['web_streams']['camera_stream_port']
         self.detection_port = self.config['web_streams']['detection_stream_port']
 
         # Параметры модели Hailo из конфига
         self.hef_path = self.config['hailo_model']['hef_path']
 
-        # Параметры детекции
-        self.target_classes = self.config['detection']['target_classes']
-        self.min_confidence = self.config['detection']['min_confidence']
-        self.min_bbox_size = self.config['detection']['min_bbox_size']
-        self.max_bbox_size = self.config['detection']['max_bbox_size']
+        # Параметры детекции, сохранения и режим консоли (читаются в каждом кадре)
+        self.apply_runtime_config()
 
         # Параметры сохранения
-        self.enable_photo_save = self.config['frame_saving']['enable_photo_save']
-        self.min_save_interval = self.config['frame_saving']['min_save_interval_seconds']
         self.last_save_time = 0
         self.photo_count = 0  # Новое в v5.5: глобальный счетчик фотографий
+        self._photo_counter = itertools.count(1)  # next() атомарен под GIL, без Lock
+        self._photos_dir = None  # Создается при первом сохранении
+
+        # Фоновая запись фото: JPEG-кодирование и диск вне потока GStreamer
+        # Очередь короткая: при переполнении вытесняется самое старое фото,
+        # поток GStreamer никогда не ждет записи на SD-карту
+        self._photo_queue = queue.Queue(maxsize=2)
+        # Свободные буферы под копии кадров: писатель возвращает буфер после записи,
+        # вытесненные из очереди кадры отдают свой буфер сразу (append/pop атомарны под GIL)
+        self._photo_buffers = []
+        threading.Thread(target=self._photo_writer, daemon=True).start()
 
         # Состояние
         self.frame_count = 0
         self.fps = 0.0
         self.last_frame_time = time.time()
 
-        # Кадры для стримов
-        self.camera_frame = None
-        self.detection_frame = None
+        # Переиспользуемые BGR-буферы кадров стримов
+        self._stream_buffers = {}
+        self._stream_seq = {'camera': itertools.count(1), 'detection': itertools.count(1)}
+        self._info_labels, self._info_values_x = build_info_panel_labels()
+
+        # Кодировщики JPEG стримов: один encode кадра на всех клиентов
+        self.stream_quality = self.config['web_streams'].get('stream_quality', 80)
+        stream_max_fps = self.config['web_streams'].get('stream_max_fps', 10)
+        self.stream_encoders = {
+            'camera': StreamEncoder(self.stream_quality, stream_max_fps),
+            'detection': StreamEncoder(self.stream_quality, stream_max_fps),
+        }
+
+        # Прогрев JIT до первого кадра (при cache=True - загрузка из кэша)
+        if NUMBA_AVAILABLE:
+            rescale_boxes(np.zeros((1, 4), dtype=np.float32), 1, 1)
 
         # Создание callback
         self.callback_obj = self.BirdCallback(self)
@@ -783,8 +1581,69 @@ class BirdDetectorV55:
         if self.config['system_monitoring']['enable_temperature_logging']:
             self.start_temperature_monitoring()
 
+        # Отслеживание изменений конфигурации
+        reload_interval = self.config.get('general', {}).get('config_reload_interval_seconds', 0)
+        if reload_interval:
+            self.start_config_watcher(reload_interval)
+
         print("\n🚀 Запуск детекции v5.5...")
 
+    def apply_runtime_config(self, config=None):
+        """
+        Перенос параметров, используемых в каждом кадре, из словаря конфигурации
+        в атрибуты. Остальные параметры (порты, логи, модель) - только при перезапуске.
+        Все значения сначала читаются и только затем присваиваются: при ошибке
+        в конфигурации (KeyError, TypeError) атрибуты остаются прежними.
+        """
+        if config is None:
+            config = self.config
+
+        # Параметры детекции
+        target_classes = frozenset(config['detection']['target_classes'])
+        min_confidence = float(config['detection']['min_confidence'])
+        min_bbox_size = float(config['detection']['min_bbox_size'])
+        max_bbox_size = float(config['detection']['max_bbox_size'])
+
+        # Параметры сохранения
+        enable_photo_save = bool(config['frame_saving']['enable_photo_save'])
+        min_save_interval = float(config['frame_saving']['min_save_interval_seconds'])
+        photo_filename_pattern = config['frame_saving']['photo_filename_pattern']
+
+        # Режим консоли
+        console_mode = config['logging'].get('console_output_mode', 'all')
+
+        self.target_classes = target_classes
+        self.min_confidence = min_confidence
+        self.min_bbox_size = min_bbox_size
+        self.max_bbox_size = max_bbox_size
+        self.enable_photo_save = enable_photo_save
+        self.min_save_interval = min_save_interval
+        self.photo_filename_pattern = photo_filename_pattern
+        self.console_mode = console_mode
+
+    def start_config_watcher(self, interval):
+        """Запуск потока, применяющего изменения YAML без перезапуска."""
+        def config_watcher():
+            """Поток периодической проверки времени изменения конфигурации."""
+            while True:
+                time.sleep(interval)
+                if not self.config_manager.reload_if_changed():
+                    continue
+                config = self.config_manager.config
+                try:
+                    self.apply_runtime_config(config)
+                except (KeyError, TypeError, ValueError, AttributeError) as e:
+                    # Ошибка в новой конфигурации не должна останавливать поток
+                    print(f"⚠️ Некорректная конфигурация ({type(e).__name__}: {e}), "
+                          f"сохранены прежние параметры")
+                    self.config_manager.config = self.config
+                    continue
+                self.config = config
+
+        watcher_thread = threading.Thread(target=config_watcher, daemon=True)
+        watcher_thread.start()
+        print(f"🔄 Отслеживание изменений конфигурации (интервал: {interval} сек)")
+
     class BirdCallback(app_callback_class):
         """Callback для обработки кадров."""
         def __init__(self, parent):
@@ -797,9 +1656,12 @@ class BirdDetectorV55:
                 return Gst.PadProbeReturn.OK
 
             self.parent.frame_count += 1
+            console_mode = self.parent.console_mode
+            visits_changed = unique_changed = False
 
             # Расчет FPS в начале
             current_time = time.time()
+            now_ns = time.monotonic_ns()
             if self.parent.frame_count > 1:
                 time_diff = current_time - self.parent.last_frame_time
                 if time_diff > 0:
@@ -812,107 +1674,104 @@ class BirdDetectorV55:
                 format_str, width, height = get_caps_info(caps)
 
                 if format_str and width and height:
-                    # Получаем кадр
-                    frame = get_numpy_from_buffer(buffer, format_str, width, height)
-
-                    if frame is not None:
-                        # Детекция
-                        roi = hailo.get_roi_from_buffer(buffer)
-                        detections_hailo = roi.get_objects_typed(hailo.HAILO_DETECTION)
-
-                        # Фильтрация детекций
-                        bird_detections = []
-                        for detection in detections_hailo:
-                            label = detection.get_label()
-                            confidence = detection.get_confidence()
-
-                            if (label in self.parent.target_classes and
-                                confidence >= self.parent.min_confidence):
-
-                                bbox = detection.get_bbox()
-                                bbox_size = bbox.width() * bbox.height()
-
-                                if (bbox_size >= self.parent.min_bbox_size and
-                                    bbox_size <= self.parent.max_bbox_size):
-
-                                    bird_detections.append({
-                                        'label': label,
-                                        'confidence': confidence,
-                                        'x': bbox.xmin(),
-                                        'y': bbox.ymin(),
-                                        'width': bbox.width(),
-                                        'height': bbox.height(),
-                                        'bbox': bbox
-                                    })
-
-                        # Получаем режим консоли для передачи в трекер
-                        console_mode = self.parent.config['logging'].get('console_output_mode', 'all')
-
-                        # Обновление трекера
-                        birds_on_frame, new_birds = self.parent.bird_tracker.update_birds(
-                            bird_detections, current_time, console_mode)
-
-                        # Логирование только при новом посещении или при наличии детекций в режиме 'all'
-                        if bird_detections and (self.parent.bird_tracker.new_visit_happened or console_mode == 'all'):
-                            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-                            stats = self.parent.bird_tracker.get_stats()
-                            self.parent.log_manager.log_detection(
-                                timestamp, birds_on_frame, stats['current_active'],
-                                stats['total_unique'], stats['total_feeding_visits'], bird_detections)
-
-                        # Логирование событий изменения счетчика
-                        if self.parent.bird_tracker.has_changes():
-                            stats = self.parent.bird_tracker.get_stats()
-                            if stats['total_feeding_visits'] > self.parent.bird_tracker.prev_total_feeding_visits:
+                    # Кадр без копирования (view на память GstBuffer), действителен внутри with
+                    with map_buffer(buffer, format_str, width, height) as frame:
+                        if frame is not None:
+                            # Детекция
+                            roi = hailo.get_roi_from_buffer(buffer)
+                            detections_hailo = roi.get_objects_typed(hailo.HAILO_DETECTION)
+
+                            # Фильтрация детекций: значения читаются за один проход,
+                            # условия проверяются одной маской numpy
+                            bird_detections = EMPTY_DETECTIONS
+                            n_detections = len(detections_hailo)
+                            if n_detections:
+                                # Фильтр по метке: class_id может быть отрицательным
+                                # или общим для нескольких меток
+                                target_classes = self.parent.target_classes
+                                labels = [d.get_label() for d in detections_hailo]
+                                is_target = np.fromiter((label in target_classes for label in labels),
+                                                        dtype=bool, count=n_detections)
+                                bboxes = [d.get_bbox() for d in detections_hailo]
+                                confidences = np.fromiter((d.get_confidence() for d in detections_hailo),
+                                                          dtype=np.float64, count=n_detections)
+                                dims = np.array([(b.xmin(), b.ymin(), b.width(), b.height()) for b in bboxes],
+                                                dtype=np.float64)
+                                sizes = dims[:, 2] * dims[:, 3]
+                                mask = ((confidences >= self.parent.min_confidence) &
+                                        (sizes >= self.parent.min_bbox_size) &
+                                        (sizes <= self.parent.max_bbox_size) &
+                                        is_target)
+
+                                keep = np.flatnonzero(mask)
+                                if keep.size:
+                                    xyxy = dims[keep].astype(np.float32)
+                                    xyxy[:, 2:] += xyxy[:, :2]
+                                    bird_detections = Detections(
+                                        labels=[labels[i] for i in keep.tolist()],
+                                        confidence=confidences[keep].astype(np.float32),
+                                        xyxy=xyxy)
+
+                            # Обновление трекера
+                            birds_on_frame, new_birds = self.parent.bird_tracker.update_birds(
+                                bird_detections, current_time, console_mode, now_ns)
+
+                            # Логирование только при новом посещении или при наличии детекций в режиме 'all'
+                            if bird_detections and (self.parent.bird_tracker.new_visit_happened or console_mode == 'all'):
+                                stats = self.parent.bird_tracker.get_stats()
+                                self.parent.log_manager.log_detection(
+                                    current_time, birds_on_frame, stats['current_active'],
+                                    stats['total_unique'], stats['total_feeding_visits'], bird_detections)
+
+                            # Логирование событий изменения счетчика
+                            visits_changed, unique_changed = self.parent.bird_tracker.consume_changes()
+                            if visits_changed:
                                 self.parent.log_manager.log_counter_event(
-                                    "Посещение кормушки", stats['total_feeding_visits'], current_time)
-                            if stats['total_unique'] > self.parent.bird_tracker.prev_total_unique:
+                                    "Посещение кормушки", self.parent.bird_tracker.total_feeding_visits, current_time)
+                            if unique_changed:
                                 self.parent.log_manager.log_counter_event(
-                                    "Новая уникальная птица", stats['total_unique'], current_time)
-
-                        # Обновление кадров для стримов
-                        self.parent.update_camera_frame(frame)
-                        self.parent.update_detection_frame(frame, bird_detections, width, height)
-
-                        # Сохранение фото
-                        if (self.parent.enable_photo_save and
-                            birds_on_frame > 0 and
-                            current_time - self.parent.last_save_time >= self.parent.min_save_interval):
-                            self.parent.save_bird_photo(frame, birds_on_frame)
-                            self.parent.last_save_time = current_time
-
-                        # Отладочное логирование производительности
-                        if self.parent.log_manager.enable_performance_log:
-                            # Получаем использование памяти (в MB)
-                            try:
-                                with open('/proc/meminfo', 'r') as f:
-                                    mem_info = f.read()
-                                total_match = re.search(r'MemTotal:\s+(\d+)', mem_info)
-                                available_match = re.search(r'MemAvailable:\s+(\d+)', mem_info)
-                                if total_match and available_match:
-                                    total_mem = int(total_match.group(1)) / 1024  # MB
-                                    available_mem = int(available_match.group(1)) / 1024  # MB
-                                    used_mem = total_mem - available_mem
-                                else:
-                                    used_mem = 0.0
-                            except:
-                                used_mem = 0.0
-
-                            # Расчет задержки кадра
-                            frame_delay = time_diff if 'time_diff' in locals() else 0.0
-
-                            # Температура CPU
-                            cpu_temp = self.parent.log_manager.get_cpu_temperature() or 0.0
-
-                            # Логируем метрики
-                            self.parent.log_manager.log_performance_debug(
-                                self.parent.fps, cpu_temp, frame_delay, used_mem,
-                                f"birds={birds_on_frame}, frame={self.parent.frame_count}"
-                            )
+                                    "Новая уникальная птица", self.parent.bird_tracker.total_unique_birds, current_time)
+
+                            # Обновление кадров для стримов - только при подключенных клиентах
+                            stream_encoders = self.parent.stream_encoders
+                            camera_frame = detection_frame = None
+                            if stream_encoders['camera'].viewers:
+                                camera_frame = self.parent.convert_stream_frame('camera', frame)
+                            if stream_encoders['detection'].viewers:
+                                # При обоих стримах RGB->BGR выполняется один раз: детекция копирует кадр камеры
+                                detection_frame = self.parent.convert_stream_frame(
+                                    'detection', frame, camera_frame[1] if camera_frame else None)
+                            if camera_frame:
+                                self.parent.update_camera_frame(*camera_frame)
+                            if detection_frame:
+                                self.parent.update_detection_frame(*detection_frame, bird_detections, width, height)
+
+                            # Сохранение фото
+                            if (self.parent.enable_photo_save and
+                                birds_on_frame > 0 and
+                                current_time - self.parent.last_save_time >= self.parent.min_save_interval):
+                                self.parent.save_bird_photo(frame, birds_on_frame, format_str)
+                                self.parent.last_save_time = current_time
+
+                            # Отладочное логирование производительности
+                            if self.parent.log_manager.cfg.enable_performance_log:
+                                # Использование памяти (MB), обновляется фоновым потоком раз в секунду
+                                used_mem = self.parent.log_manager.used_memory
+
+                                # Расчет задержки кадра
+                                frame_delay = time_diff if 'time_diff' in locals() else 0.0
+
+                                # Температура CPU
+                                cpu_temp = self.parent.log_manager.cpu_temperature or 0.0
+
+                                # Логируем метрики
+                                self.parent.log_manager.log_performance_debug(
+                                    self.parent.fps, cpu_temp, frame_delay, used_mem,
+                                    f"birds={birds_on_frame}, frame={self.parent.frame_count}",
+                                    current_time
+                                )
 
                 # Вывод статистики в зависимости от режима
-                console_mode = self.parent.config['logging'].get('console_output_mode', 'all')
-
                 if console_mode == 'all':
                     # Выводим все как раньше
                     if self.parent.frame_count % 30 == 0:
@@ -923,7 +1782,7 @@ class BirdDetectorV55:
 
                 elif console_mode == 'changes_only':
                     # Выводим только при изменениях счетчиков
-                    if self.parent.bird_tracker.has_changes():
+                    if visits_changed or unique_changed:
                         stats = self.parent.bird_tracker.get_stats()
                         print(f"📊 ИЗМЕНЕНИЕ | Уникальных: {stats['total_unique']} | Посещений: {stats['total_feeding_visits']}")
 
@@ -937,41 +1796,59 @@ class BirdDetectorV55:
 
             return Gst.PadProbeReturn.OK
 
-    def update_camera_frame(self, frame):
-        """Обновление кадра для чистого стрима."""
+    def next_stream_buffer(self, stream_name, shape):
+        """
+        Следующий свободный BGR-буфер стрима по кругу; буферы выделяются заново только при смене размера.
+        Опубликованный и кодируемый кадры пропускаются - кодировщик не получит наполовину перезаписанный кадр.
+        """
+        buffers = self._stream_buffers.get(stream_name)
+        if buffers is None or buffers[0].shape != shape:
+            buffers = [np.empty(shape, dtype=np.uint8) for _ in range(STREAM_BUFFERS)]
+            self._stream_buffers[stream_name] = buffers
+        seq = next(self._stream_seq[stream_name])
+        busy = self.stream_encoders[stream_name].busy_images()
+        for offset in range(STREAM_BUFFERS):
+            buffer = buffers[(seq + offset) % STREAM_BUFFERS]
+            if id(buffer) not in busy:
+                return seq, buffer
+        # Недостижимо при STREAM_BUFFERS > 2: занято не более двух буферов
+        return seq, buffers[seq % STREAM_BUFFERS]
+
+    def convert_stream_frame(self, stream_name, frame, bgr=None):
+        """BGR-кадр в следующем буфере стрима: конвертация из RGB или копия готового BGR-кадра."""
+        seq, display = self.next_stream_buffer(stream_name, frame.shape[:2] + (3,))
+        if bgr is not None:
+            np.copyto(display, bgr)
+        else:
+            # Конвертация сразу в заранее выделенный буфер - без лишней копии
+            cv2.cvtColor(frame, cv2.COLOR_RGB2BGR, dst=display)
+        return seq, display
+
+    def update_camera_frame(self, seq, display):
+        """Обновление кадра для чистого стрима (display - BGR-буфер из convert_stream_frame)."""
         try:
-            frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-            display = frame_bgr.copy()
-
             # Минимальная информация
             cv2.putText(display, "Camera Stream v5.5", (10, 30),
                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
             cv2.putText(display, f"Frame: {self.frame_count}", (10, 60),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
 
-            self.camera_frame = display
+            self.stream_encoders['camera'].publish(StreamFrame(seq, display))
 
         except Exception as e:
             print(f"❌ Ошибка update_camera_frame: {e}")
 
-    def update_detection_frame(self, frame, detections, width, height):
-        """Обновление кадра для стрима с детекцией."""
+    def update_detection_frame(self, seq, display, detections, width, height):
+        """Обновление кадра для стрима с детекцией (display - BGR-буфер из convert_stream_frame)."""
         try:
-            frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-            display = frame_bgr.copy()
-
             # Рисуем bounding boxes
-            for detection in detections:
-                bbox = detection['bbox']
-                x1 = int(bbox.xmin() * width)
-                y1 = int(bbox.ymin() * height)
-                x2 = int(bbox.xmax() * width)
-                y2 = int(bbox.ymax() * height)
+            # Пересчет всех bbox в пиксели одним вызовом (Numba JIT или numpy)
+            boxes_px = rescale_boxes(detections.xyxy, width, height).tolist() if detections else []
 
+            for label, confidence, (x1, y1, x2, y2) in zip(detections.labels, detections.confidence.tolist(), boxes_px):
                 cv2.rectangle(display, (x1, y1), (x2, y2), (0, 255, 0), 2)
 
-                confidence = detection['confidence']
-                text = f"{detection['label']} {confidence:.2f}"
+                text = f"{label} {confidence:.2f}"
                 cv2.putText(display, text, (x1, y1-10),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
 
@@ -979,58 +1856,117 @@ class BirdDetectorV55:
             stats = self.bird_tracker.get_stats()
 
             # Получаем температуру процессора (целочисленная, без значка градуса)
-            cpu_temp = self.log_manager.get_cpu_temperature()
+            cpu_temp = self.log_manager.cpu_temperature
             temp_str = f"{int(cpu_temp)} C" if cpu_temp is not None else "N/A"
 
-            info_lines = [
-                f"Frame: {self.frame_count}",
-                f"FPS: {self.fps:.1f}",
-                f"Birds: {stats['current_on_frame']}",
-                f"Active: {stats['current_active']}",
-                f"Unique: {stats['total_unique']}",
-                f"Visits: {stats['total_feeding_visits']}",
-                f"Temp: {temp_str}",
-                f"Time: {datetime.now().strftime('%H:%M:%S')}"
-            ]
-
-            y_offset = 30
-            for line in info_lines:
-                cv2.putText(display, line, (10, y_offset),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-                y_offset += 25
-
-            self.detection_frame = display
+            # Готовые подписи накладываются осветлением (белый текст на черном фоне)
+            panel_height = min(self._info_labels.shape[0], display.shape[0])
+            panel_width = min(self._info_labels.shape[1], display.shape[1])
+            panel = display[:panel_height, :panel_width]
+            np.maximum(panel, self._info_labels[:panel_height, :panel_width], out=panel)
+
+            info_values = (
+                str(self.frame_count),
+                f"{self.fps:.1f}",
+                str(stats['current_on_frame']),
+                str(stats['current_active']),
+                str(stats['total_unique']),
+                str(stats['total_feeding_visits']),
+                temp_str,
+                get_wall_clock(self.last_frame_time).time,
+            )
+
+            y_offset = INFO_PANEL_TOP
+            for value in info_values:
+                cv2.putText(display, value, (self._info_values_x, y_offset),
+                           INFO_PANEL_FONT, INFO_PANEL_SCALE, (255, 255, 255), INFO_PANEL_THICKNESS)
+                y_offset += INFO_PANEL_STEP
+
+            self.stream_encoders['detection'].publish(StreamFrame(seq, display))
 
         except Exception as e:
             print(f"❌ Ошибка update_detection_frame: {e}")
 
-    def save_bird_photo(self, frame, bird_count):
-        """Сохранение фото с правильными цветами и уникальным счетчиком."""
+    def save_bird_photo(self, frame, bird_count, format_str="RGB"):
+        """Постановка фото в очередь записи с уникальным счетчиком."""
         try:
-            # Создание папки для фото
-            photos_dir = Path(self.config['logging']['logs_path']) / self.log_manager.session_folder.name / "photos"
-            photos_dir.mkdir(exist_ok=True)
-
-            # Увеличиваем глобальный счетчик фотографий
-            self.photo_count += 1
+            # Папка для фото создается один раз, при первом сохранении
+            photos_dir = self._photos_dir
+            if photos_dir is None:
+                photos_dir = Path(self.config['logging']['logs_path']) / self.log_manager.session_folder.name / "photos"
+                photos_dir.mkdir(parents=True, exist_ok=True)
+                self._photos_dir = photos_dir
+
+            # Вытеснение самого старого фото: сохраняется более свежий кадр
+            if self._photo_queue.full():
+                try:
+                    dropped, _, _, dropped_number = self._photo_queue.get_nowait()
+                    self._photo_buffers.append(dropped)
+                    print(f"⚠️ Очередь записи фото переполнена, фото #{dropped_number} пропущено")
+                except queue.Empty:
+                    pass
 
             # Имя файла с уникальным счетчиком
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = self.config['frame_saving']['photo_filename_pattern'].format(
-                timestamp=timestamp, bird_count=self.photo_count)
+            photo_number = next(self._photo_counter)
+            timestamp = get_wall_clock(self.last_frame_time).photo
+            filename = self.photo_filename_pattern.format(timestamp=timestamp, bird_count=photo_number)
             filepath = photos_dir / filename
 
-            # Конвертация RGB → BGR для правильных цветов
-            frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-            cv2.imwrite(str(filepath), frame_bgr)
-            print(f"💾 Фото сохранено: {filepath} (фото #{self.photo_count})")
+            # Копия обязательна: кадр - view на буфер GStreamer, который будет освобожден.
+            # Копируем в свободный буфер вместо выделения нового массива
+            try:
+                slot = self._photo_buffers.pop()
+            except IndexError:
+                slot = None
+            if slot is None or slot.shape != frame.shape or slot.dtype != frame.dtype:
+                slot = np.empty_like(frame)
+            np.copyto(slot, frame)
 
+            self._photo_queue.put_nowait((slot, format_str, filepath, photo_number))
+
+            # Последний выданный номер фото
+            self.photo_count = photo_number
+
+        except queue.Full:
+            print("⚠️ Очередь записи фото переполнена, кадр пропущен")
         except Exception as e:
             print(f"❌ Ошибка сохранения фото: {e}")
 
+    def _photo_writer(self):
+        """Поток записи фото с правильными цветами."""
+        while True:
+            frame, format_str, filepath, photo_number = self._photo_queue.get()
+            try:
+                if TURBOJPEG_AVAILABLE and format_str in ('YUY2', 'YUYV', 'UYVY'):
+                    # YUV 4:2:2 с камеры кодируется как есть, без перевода в RGB
+                    height, width = frame.shape[:2]
+                    jpeg = turbo_jpeg.encode_from_yuv(yuv422_to_planar(frame, format_str), height, width,
+                                                      quality=95, jpeg_subsample=TJSAMP_422)
+                    with open(filepath, 'wb') as f:
+                        f.write(jpeg)
+                elif TURBOJPEG_AVAILABLE and format_str == 'RGB':
+                    # libjpeg-turbo кодирует RGB напрямую, без конвертации в BGR
+                    jpeg = turbo_jpeg.encode(frame, quality=95, pixel_format=TJPF_RGB,
+                                             jpeg_subsample=TJSAMP_420)
+                    with open(filepath, 'wb') as f:
+                        f.write(jpeg)
+                else:
+                    # Конвертация в BGR для правильных цветов
+                    code = _TO_BGR_CODES.get(format_str)
+                    frame_bgr = cv2.cvtColor(frame, code) if code is not None else frame
+                    cv2.imwrite(str(filepath), frame_bgr)
+                print(f"💾 Фото сохранено: {filepath} (фото #{photo_number})")
+
+            except Exception as e:
+                print(f"❌ Ошибка сохранения фото: {e}")
+            finally:
+                self._photo_buffers.append(frame)
+
     def start_camera_stream_server(self):
         """Запуск сервера чистого стрима."""
         class CameraStreamHandler(BaseHTTPRequestHandler):
+            disable_nagle_algorithm = True  # TCP_NODELAY: часть кадра уходит без задержки Nagle
+
             def do_GET(self):
                 if self.path == '/':
                     self.send_response(200)
@@ -1048,18 +1984,19 @@ class BirdDetectorV55:
                     self.send_header('Cache-Control', 'no-cache')
                     self.end_headers()
 
+                    encoder = self.server.detector.stream_encoders['camera']
+                    encoder.add_viewer()
+                    seq = 0
                     try:
                         while True:
-                            if self.server.detector.camera_frame is not None:
-                                _, jpeg = cv2.imencode('.jpg', self.server.detector.camera_frame)
-                                if jpeg is not None:
-                                    self.wfile.write(b'--frame\r\n')
-                                    self.wfile.write(b'Content-Type: image/jpeg\r\n\r\n')
-                                    self.wfile.write(jpeg.tobytes())
-                                    self.wfile.write(b'\r\n')
-                            time.sleep(0.1)
+                            # Ожидание следующего закодированного кадра (без опроса)
+                            seq, part = encoder.wait_part(seq, timeout=5.0)
+                            if part is not None:
+                                self.wfile.write(part)
                     except:
                         pass
+                    finally:
+                        encoder.remove_viewer()
                 else:
                     self.send_error(404)
 
@@ -1067,7 +2004,7 @@ class BirdDetectorV55:
                 return
 
         try:
-            server = HTTPServer(('0.0.0.0', self.camera_port), CameraStreamHandler)
+            server = ThreadingHTTPServer(('0.0.0.0', self.camera_port), CameraStreamHandler)
             server.detector = self
             thread = threading.Thread(target=server.serve_forever, daemon=True)
             thread.start()
@@ -1078,6 +2015,8 @@ class BirdDetectorV55:
     def start_detection_stream_server(self):
         """Запуск сервера стрима с детекцией."""
         class DetectionStreamHandler(BaseHTTPRequestHandler):
+            disable_nagle_algorithm = True  # TCP_NODELAY: часть кадра уходит без задержки Nagle
+
             def do_GET(self):
                 if self.path == '/':
                     self.send_response(200)
@@ -1095,18 +2034,19 @@ class BirdDetectorV55:
                     self.send_header('Cache-Control', 'no-cache')
                     self.end_headers()
 
+                    encoder = self.server.detector.stream_encoders['detection']
+                    encoder.add_viewer()
+                    seq = 0
                     try:
                         while True:
-                            if self.server.detector.detection_frame is not None:
-                                _, jpeg = cv2.imencode('.jpg', self.server.detector.detection_frame)
-                                if jpeg is not None:
-                                    self.wfile.write(b'--frame\r\n')
-                                    self.wfile.write(b'Content-Type: image/jpeg\r\n\r\n')
-                                    self.wfile.write(jpeg.tobytes())
-                                    self.wfile.write(b'\r\n')
-                            time.sleep(0.1)
+                            # Ожидание следующего закодированного кадра (без опроса)
+                            seq, part = encoder.wait_part(seq, timeout=5.0)
+                            if part is not None:
+                                self.wfile.write(part)
                     except:
                         pass
+                    finally:
+                        encoder.remove_viewer()
                 else:
                     self.send_error(404)
 
@@ -1114,7 +2054,7 @@ class BirdDetectorV55:
                 return
 
         try:
-            server = HTTPServer(('0.0.0.0', self.detection_port), DetectionStreamHandler)
+            server = ThreadingHTTPServer(('0.0.0.0', self.detection_port), DetectionStreamHandler)
             server.detector = self
             thread = threading.Thread(target=server.serve_forever, daemon=True)
             thread.start()
@@ -1128,7 +2068,7 @@ class BirdDetectorV55:
             """Поток для периодического логирования температуры."""
             while True:
                 # Получаем температуру и FPS
-                temperature = self.log_manager.get_cpu_temperature()
+                temperature = self.log_manager.cpu_temperature
                 current_fps = getattr(self, 'fps', 0.0)
 
                 if temperature is not None:
@@ -1136,15 +2076,15 @@ class BirdDetectorV55:
                     self.log_manager.log_temperature(temperature, time.time(), current_fps)
 
                 # Спим точно интервал времени
-                time.sleep(self.log_manager.temperature_log_interval)
+                time.sleep(self.log_manager.cfg.temperature_log_interval)
 
         # Запускаем поток как daemon (завершится при остановке основного процесса)
         temperature_thread = threading.Thread(target=temperature_monitor, daemon=True)
         temperature_thread.start()
-        print(f"🌡️ Мониторинг температуры запущен (интервал: {self.log_manager.temperature_log_interval} сек)")
+        print(f"🌡️ Мониторинг температуры запущен (интервал: {self.log_manager.cfg.temperature_log_interval} сек)")
 
         # Первая запись температуры при запуске
-        initial_temp = self.log_manager.get_cpu_temperature()
+        initial_temp = self.log_manager.cpu_temperature
         if initial_temp is not None:
             self.log_manager.log_temperature(initial_temp, time.time())
             print(f"🌡️ Начальная температура процессора: {initial_temp}°C")
@@ -1152,7 +2092,13 @@ class BirdDetectorV55:
     def run(self):
         """Запуск GStreamer детекции."""
         try:
-            app = GStreamerDetectionApp(self.callback_obj.process_callback, self.callback_obj)
+            # Модель из конфига передается пайплайну, если не задана в командной строке
+            # Учитываются обе формы: '--hef-path PATH' и '--hef-path=PATH'
+            if not any(arg == '--hef-path' or arg.startswith('--hef-path=') for arg in sys.argv[1:]):
+                sys.argv.extend(['--hef-path', self.hef_path])
+
+            batch_size = max(1, int(self.config['hailo_model'].get('batch_size', 2)))
+            app = BirdDetectionApp(self.callback_obj.process_callback, self.callback_obj, batch_size)
             app.run()
         except KeyboardInterrupt:
             print("\n🛑 Остановлено пользователем")
@@ -6,16 +6,26 @@ Video Creator для Bird Detector
 Версия: 1.0
 """
 
+import io
 import os
 import sys
 import yaml
 import logging
 import argparse
 import subprocess
+import shutil
+import threading
 import re
+import errno
+import tempfile
+import copy
+import functools
+from collections import OrderedDict, deque
+from operator import itemgetter
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any, Tuple
 
 try:
     from moviepy import VideoFileClip, AudioFileClip, CompositeAudioClip
@@ -30,6 +40,115 @@ except ImportError:
     except ImportError:
         TQDM_AVAILABLE = False
 
+# libyaml (если PyYAML собран с ним): тот же safe-разбор, в 5-10 раз быстрее
+try:
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader
+
+
+# Разобранные конфигурации: абсолютный путь -> (mtime_ns, размер, словарь), LRU
+_YAML_CACHE: OrderedDict[str, Tuple[int, int, Dict[str, Any]]] = OrderedDict()
+_YAML_CACHE_MAX = 100
+
+# Строк stderr ffmpeg, сохраняемых для сообщения об ошибке (весь вывод идет в лог DEBUG)
+FFMPEG_STDERR_TAIL = 50
+
+# Логирование настраивается первым созданным VideoCreator
+_LOGGING_CONFIGURED = False
+
+
+# Аппаратные кодировщики H.264 по значению output.hw_accel
+HW_ENCODERS = {
+    'nvenc': 'h264_nvenc',
+    'qsv': 'h264_qsv',
+    'vaapi': 'h264_vaapi',
+    'v4l2m2m': 'h264_v4l2m2m',
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _available_encoders() -> frozenset:
+    """Имена кодировщиков ffmpeg (один запуск ffmpeg -encoders за процесс)"""
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'],
+                                capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return frozenset()
+    # Строки вида " V....D libx264   libx264 H.264 / AVC ..."
+    return frozenset(parts[1] for parts in map(str.split, result.stdout.splitlines())
+                     if len(parts) >= 2 and len(parts[0]) == 6)
+
+
+@functools.lru_cache(maxsize=None)
+def _vfr_args() -> Tuple[str, ...]:
+    """
+    Режим переменной частоты кадров для concat: -fps_mode vfr (ffmpeg 5.1+),
+    на старых сборках - устаревший -vsync vfr (один запуск ffmpeg -h long за процесс)
+    """
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-h', 'long'],
+                                capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return ('-vsync', 'vfr')
+    return ('-fps_mode', 'vfr') if '-fps_mode' in result.stdout else ('-vsync', 'vfr')
+
+
+# Ошибки, означающие "ФС не поддерживает такую ссылку": только в этом случае кадр копируется
+_LINK_UNSUPPORTED_ERRNOS = frozenset(code for code in (
+    errno.EXDEV, errno.EPERM, errno.EMLINK,
+    getattr(errno, 'ENOTSUP', None), getattr(errno, 'EOPNOTSUPP', None)) if code is not None)
+
+
+def _fast_copy(src: str, dst: Path):
+    """
+    Копирование в ядре через copy_file_range (reflink на CoW ФС), иначе обычное.
+    dst создается заново ('xb'): существующий файл или ссылка на исходный кадр
+    не перезаписываются.
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'xb') as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size if hasattr(os, 'copy_file_range') else -1
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except OSError:
+            # ФС не поддерживает copy_file_range (EXDEV на старых ядрах, EINVAL, ENOSYS)
+            remaining = -1
+        if remaining != 0:
+            # Обычное копирование в уже созданный файл, с начала
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+            shutil.copyfileobj(fsrc, fdst, 1 << 20)
+
+
+def _symlink(src: str, dst: Path):
+    """Символическая ссылка на кадр: ffmpeg откроет исходный файл по ссылке"""
+    os.symlink(os.path.abspath(src), dst)
+
+
+def _probe_stage_method(src: str, dst: Path) -> Callable[[str, Path], None]:
+    """
+    Размещение первого кадра перебором способов: жесткая ссылка (та же ФС -
+    только запись каталога), символическая ссылка (другое устройство), копия.
+    Возвращает сработавший способ - он же применяется к остальным кадрам.
+    К следующему способу переходим только если ссылку ФС не поддерживает;
+    остальные ошибки (EEXIST, ENOENT, EACCES) пробрасываются.
+    """
+    for method in (os.link, _symlink):
+        try:
+            method(src, dst)
+            return method
+        except OSError as e:
+            if e.errno not in _LINK_UNSUPPORTED_ERRNOS:
+                raise
+    _fast_copy(src, dst)
+    return _fast_copy
+
+
 class VideoCreator:
     """Класс для создания видео из последовательности изображений"""
 
@@ -38,13 +157,39 @@ class VideoCreator:
         self.config = self._load_config()
         self._setup_logging()
         self.logger = logging.getLogger(__name__)
+        self._frame_patterns: Dict[str, re.Pattern] = {}
+        self._apply_input_config()
+
+    def _apply_input_config(self):
+        """Производные значения секции input, вычисляемые один раз при загрузке конфигурации"""
+        input_config = self.config.get('input') or {}
+        self._exclude_frames = frozenset(input_config.get('exclude_frames') or ())
+
+    def apply_overrides(self, overrides: Dict[str, Any]):
+        """Наложение переопределений на загруженную конфигурацию"""
+        _deep_merge(self.config, overrides)
+        self._apply_input_config()
 
     def _load_config(self) -> Dict[str, Any]:
         """Загрузка конфигурации из YAML файла"""
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-            return config
+            # Повторное создание VideoCreator с тем же файлом не разбирает YAML заново
+            path = os.path.abspath(self.config_path)
+            st = os.stat(path)
+            cached = _YAML_CACHE.get(path)
+            if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+                _YAML_CACHE.move_to_end(path)
+                # Копия: изменения конфигурации экземпляром не попадают в кэш
+                return copy.deepcopy(cached[2])
+
+            with open(path, 'r', encoding='utf-8') as f:
+                config = yaml.load(f, Loader=YamlSafeLoader)
+
+            _YAML_CACHE[path] = (st.st_mtime_ns, st.st_size, config)
+            _YAML_CACHE.move_to_end(path)
+            if len(_YAML_CACHE) > _YAML_CACHE_MAX:
+                _YAML_CACHE.popitem(last=False)
+            return copy.deepcopy(config)
         except FileNotFoundError:
             print(f"Ошибка: Конфигурационный файл '{self.config_path}' не найден")
             sys.exit(1)
@@ -53,7 +198,14 @@ class VideoCreator:
             sys.exit(1)
 
     def _setup_logging(self):
-        """Настройка логирования"""
+        """Настройка логирования (один раз за процесс)"""
+        global _LOGGING_CONFIGURED
+        # Обработчики создаются до вызова basicConfig: без проверки каждый новый
+        # VideoCreator открывал бы файл лога заново
+        if _LOGGING_CONFIGURED:
+            return
+        _LOGGING_CONFIGURED = True
+
         log_config = self.config.get('logging', {})
         log_level = getattr(logging, log_config.get('log_level', 'INFO').upper())
 
@@ -67,11 +219,18 @@ class VideoCreator:
             ]
         )
 
-    def _parse_frame_number(self, filename: str, tag: str) -> Optional[int]:
+    def _frame_pattern(self, tag: str) -> re.Pattern:
+        """Скомпилированный шаблон номера кадра для тега (компилируется один раз)"""
+        pattern = self._frame_patterns.get(tag)
+        if pattern is None:
+            pattern = re.compile(rf'{re.escape(tag)}(\d+)', re.IGNORECASE)
+            self._frame_patterns[tag] = pattern
+        return pattern
+
+    def _parse_frame_number(self, filename: str, pattern: re.Pattern) -> Optional[int]:
         """Извлечение номера кадра из имени файла"""
         # Ищем тег в имени файла
-        pattern = rf'{re.escape(tag)}(\d+)'
-        match = re.search(pattern, filename, re.IGNORECASE)
+        match = pattern.search(filename)
         return int(match.group(1)) if match else None
 
     def _get_frame_files(self) -> List[str]:
@@ -82,26 +241,28 @@ class VideoCreator:
         if not frames_folder.exists():
             raise FileNotFoundError(f"Папка с кадрами не найдена: {frames_folder}")
 
-        # Получаем все JPG файлы
-        frame_files = list(frames_folder.glob('*.jpg')) + list(frames_folder.glob('*.jpeg'))
+        # Получаем все JPG файлы за один проход по каталогу (тип файла из DirEntry, без stat)
+        with os.scandir(frames_folder) as it:
+            frame_files = [entry for entry in it
+                           if entry.name.lower().endswith(('.jpg', '.jpeg'))
+                           and not entry.name.startswith('.') and entry.is_file()]
 
         # Фильтруем по тегу и диапазону
-        filtered_files = []
-        tag = input_config['tag']
+        pattern = self._frame_pattern(input_config['tag'])
         start_frame = input_config['start_frame']
         end_frame = input_config['end_frame'] or float('inf')
-        exclude_frames = set(input_config.get('exclude_frames', []))
+        exclude_frames = self._exclude_frames
 
-        for file_path in frame_files:
-            frame_num = self._parse_frame_number(file_path.name, tag)
-            if frame_num is None:
-                continue
-            if start_frame <= frame_num <= end_frame and frame_num not in exclude_frames:
-                filtered_files.append((frame_num, str(file_path)))
+        parse = self._parse_frame_number
+        numbered = ((parse(entry.name, pattern), entry.path) for entry in frame_files)
 
-        # Сортируем по номеру кадра
-        filtered_files.sort(key=lambda x: x[0])
-        return [fp for _, fp in filtered_files]
+        # Отбор и сортировка по номеру кадра за один проход, ключ сортировки - на C
+        filtered_files = sorted(
+            (item for item in numbered
+             if item[0] is not None and start_frame <= item[0] <= end_frame
+             and item[0] not in exclude_frames),
+            key=itemgetter(0))
+        return list(map(itemgetter(1), filtered_files))
 
     def _calculate_timing(self, frame_count: int) -> tuple:
         """Расчет параметров времени"""
@@ -118,47 +279,200 @@ class VideoCreator:
 
         return interval_ms, total_duration_ms, fps
 
+    def _write_concat_list(self, frame_files: List[str], temp_dir: Path, fps: float) -> List[str]:
+        """Список кадров для concat demuxer ffmpeg; возвращает аргументы входа ffmpeg"""
+        list_path = temp_dir / 'concat.txt'
+        duration = f"duration {1.0 / fps:.6f}\n"
+        entries = []
+        for frame_file in frame_files:
+            # Кавычки в пути экранируются по правилам ffmpeg: ' -> '\''
+            quoted = os.path.abspath(frame_file).replace("'", "'\\''")
+            entries.append(f"file '{quoted}'\n")
+            entries.append(duration)
+        # Длительность последнего кадра учитывается, только если за ним следует еще одна запись
+        entries.append(entries[-2])
+
+        # Один буфер 1 МБ и одна запись: список на тысячи кадров уходит несколькими системными вызовами
+        with open(list_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.write(''.join(entries))
+        print(f"✅ Список из {len(frame_files)} кадров подготовлен")
+
+        return ['-f', 'concat', '-safe', '0', '-i', str(list_path), *_vfr_args()]
+
+    def _stage_frames(self, frame_files: List[str], temp_dir: Path, fps: float) -> List[str]:
+        """Копирование кадров с последовательными именами; возвращает аргументы входа ffmpeg"""
+        print("📂 Подготовка кадров...")
+        dst_files = [temp_dir / f"frame_{i:06d}.jpg" for i in range(len(frame_files))]
+
+        # Все кадры обычно в одной папке: способ выбирается один раз, без перебора на каждом файле
+        stage = _probe_stage_method(frame_files[0], dst_files[0])
+
+        if stage is _fast_copy:
+            # Копирование ограничено вводом-выводом (системные вызовы отпускают GIL) - параллельно
+            max_workers = min(32, (os.cpu_count() or 1) * 2)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                copied = executor.map(_fast_copy, frame_files[1:], dst_files[1:])
+                if TQDM_AVAILABLE:
+                    copied = tqdm(copied, total=len(frame_files) - 1, desc="Копирование кадров", unit="файл")
+                for _ in copied:
+                    pass
+        else:
+            # Ссылки - один системный вызов на кадр без данных: простой цикл быстрее пула потоков
+            for src_file, dst_file in zip(frame_files[1:], dst_files[1:]):
+                try:
+                    stage(src_file, dst_file)
+                except OSError as e:
+                    # Копия - только если ссылку нельзя создать (другая ФС, лимит ссылок);
+                    # прочие ошибки (в т.ч. EEXIST) не маскируются
+                    if e.errno not in _LINK_UNSUPPORTED_ERRNOS:
+                        raise
+                    _fast_copy(src_file, dst_file)
+        print(f"✅ Подготовлено {len(frame_files)} кадров ({stage.__name__})")
+
+        return ['-framerate', str(fps), '-i', str(temp_dir / 'frame_%06d.jpg')]
+
+    def _video_encoder_args(self, output_config: Dict) -> Tuple[List[str], List[str]]:
+        """Аргументы кодировщика ffmpeg с учетом hw_accel: (перед входом, после входа)"""
+        quality = str(output_config.get('video_quality', 23))
+        preset = output_config.get('preset', 'medium')
+        # yuv420p требует четных размеров кадра
+        even_scale = 'scale=trunc(iw/2)*2:trunc(ih/2)*2'
+
+        hw_accel = output_config.get('hw_accel', 'none')
+        encoder = HW_ENCODERS.get(hw_accel)
+        if encoder and encoder not in _available_encoders():
+            self.logger.warning(f"Кодировщик {encoder} недоступен в ffmpeg, используется программный")
+            encoder = None
+
+        if encoder is None:
+            video_codec = output_config.get('video_codec', 'libx264')
+            args = ['-vf', even_scale, '-c:v', video_codec, '-crf', quality, '-preset', preset,
+                    '-pix_fmt', 'yuv420p', '-threads', '0']  # Все ядра для кодирования
+            if video_codec == 'libx264':
+                args += ['-x264-params', 'threads=auto:lookahead-threads=auto:sliced-threads=0']
+            return [], args
+
+        self.logger.info(f"Аппаратное кодирование: {encoder}")
+        if hw_accel == 'nvenc':
+            return [], ['-vf', even_scale, '-c:v', encoder, '-preset', 'p4', '-tune', 'hq',
+                        '-rc', 'vbr', '-cq', quality, '-b:v', '0', '-pix_fmt', 'yuv420p']
+        if hw_accel == 'qsv':
+            return [], ['-vf', even_scale, '-c:v', encoder, '-global_quality', quality,
+                        '-preset', preset, '-pix_fmt', 'nv12']
+        if hw_accel == 'vaapi':
+            device = output_config.get('vaapi_device', '/dev/dri/renderD128')
+            return ['-vaapi_device', device], ['-vf', f'{even_scale},format=nv12,hwupload',
+                                               '-c:v', encoder, '-qp', quality]
+        # v4l2m2m (Raspberry Pi 4): качество задается битрейтом, CRF не поддерживается
+        return [], ['-vf', even_scale, '-c:v', encoder,
+                    '-b:v', str(output_config.get('video_bitrate', '8M')), '-pix_fmt', 'yuv420p']
+
+    def _run_ffmpeg(self, cmd: List[str], pipe_files: Optional[List[str]],
+                    timeout: float) -> subprocess.CompletedProcess:
+        """
+        Запуск ffmpeg: stderr построчно передается в лог (память не растет с длительностью
+        кодирования), в результате остаются последние FFMPEG_STDERR_TAIL строк.
+        При pipe_files кадры передаются в stdin из отдельного потока.
+        """
+        proc = subprocess.Popen(cmd,
+                                stdin=subprocess.PIPE if pipe_files is not None else subprocess.DEVNULL,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+        feeder = None
+        if pipe_files is not None:
+            def feed_frames():
+                try:
+                    for frame_file in pipe_files:
+                        with open(frame_file, 'rb') as f:
+                            shutil.copyfileobj(f, proc.stdin, 1 << 20)
+                except BrokenPipeError:
+                    pass  # ffmpeg завершился раньше - причина будет в stderr
+                finally:
+                    try:
+                        proc.stdin.close()
+                    except BrokenPipeError:
+                        pass
+
+            feeder = threading.Thread(target=feed_frames, daemon=True)
+            feeder.start()
+
+        # Таймаут - принудительное завершение ffmpeg по таймеру: чтение stderr блокирующее
+        timed_out = threading.Event()
+
+        def kill_on_timeout():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, kill_on_timeout)
+        timer.start()
+        tail = deque(maxlen=FFMPEG_STDERR_TAIL)
+        try:
+            # Универсальные переводы строк: строки прогресса ffmpeg разделены '\r'
+            for line in io.TextIOWrapper(proc.stderr, encoding='utf-8', errors='replace'):
+                line = line.rstrip()
+                if line:
+                    self.logger.debug(line)
+                    tail.append(line)
+            returncode = proc.wait()
+        finally:
+            timer.cancel()
+            if feeder is not None:
+                feeder.join()
+
+        stderr = '\n'.join(tail)
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout, stderr=stderr)
+        return subprocess.CompletedProcess(cmd, returncode, None, stderr)
+
     def _create_video_ffmpeg(self, frame_files: List[str], output_path: str, fps: float) -> bool:
         """Создание видео с помощью ffmpeg"""
         if not frame_files:
             self.logger.error("Нет кадров для создания видео")
             return False
 
-        # Создаем временную папку с пронумерованными файлами
-        temp_dir = Path(self.config.get('advanced', {}).get('temp_folder', '/tmp/video_creator'))
-        temp_dir.mkdir(exist_ok=True)
-
-        # Копируем файлы с последовательными именами
-        import shutil
-        print("📂 Подготовка кадров...")
-        if TQDM_AVAILABLE:
-            for i, src_file in enumerate(tqdm(frame_files, desc="Копирование кадров", unit="файл")):
-                dst_file = temp_dir / f"frame_{i:06d}.jpg"
-                shutil.copy2(src_file, dst_file)
+        advanced_config = self.config.get('advanced', {})
+        temp_folder = Path(advanced_config.get('temp_folder', '/tmp/video_creator'))
+        input_mode = advanced_config.get('input_mode', 'concat')
+        temp_dir = None
+
+        # concat: кадры читаются ffmpeg напрямую по списку файлов, без копирования;
+        # sequence: копии с последовательными именами frame_%06d.jpg;
+        # pipe: байты JPEG подаются в stdin ffmpeg, без временных файлов
+        pipe_files = None
+        if input_mode == 'pipe':
+            input_args = ['-f', 'image2pipe', '-framerate', str(fps), '-c:v', 'mjpeg', '-i', '-']
+            pipe_files = frame_files
         else:
-            for i, src_file in enumerate(frame_files):
-                dst_file = temp_dir / f"frame_{i:06d}.jpg"
-                shutil.copy2(src_file, dst_file)
-            print(f"✅ Скопировано {len(frame_files)} кадров")
+            # Свой пустой каталог на каждый запуск: остатки прошлых запусков
+            # (в т.ч. ссылки на исходные кадры) не используются и не удаляются чужие файлы
+            temp_folder.mkdir(parents=True, exist_ok=True)
+            temp_dir = Path(tempfile.mkdtemp(prefix='frames_', dir=temp_folder))
+            try:
+                if input_mode == 'sequence':
+                    input_args = self._stage_frames(frame_files, temp_dir, fps)
+                else:
+                    input_args = self._write_concat_list(frame_files, temp_dir, fps)
+            except OSError as e:
+                self.logger.error(f"Ошибка подготовки кадров: {e}")
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                return False
 
         # Формируем команду ffmpeg
-        output_config = self.config['output']
+        device_args, encoder_args = self._video_encoder_args(self.config['output'])
         cmd = [
             'ffmpeg',
             '-y',  # Перезаписывать без вопросов
-            '-framerate', str(fps),
-            '-i', str(temp_dir / 'frame_%06d.jpg'),
-            '-c:v', output_config.get('video_codec', 'libx264'),
-            '-crf', str(output_config.get('video_quality', 23)),
-            '-preset', output_config.get('preset', 'medium'),
-            '-pix_fmt', 'yuv420p',
+            *device_args,
+            '-thread_queue_size', '1024',  # Чтение кадров не ждет занятый кодировщик
+            *input_args,
+            *encoder_args,
             str(output_path)
         ]
 
         self.logger.info(f"Выполнение команды: {' '.join(cmd)}")
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=1800)  # Увеличено до 30 минут
+            result = self._run_ffmpeg(cmd, pipe_files, timeout=1800)  # Увеличено до 30 минут
             if result.returncode == 0:
                 self.logger.info("Видео создано успешно")
                 return True
@@ -169,13 +483,71 @@ class VideoCreator:
             self.logger.error("Превышено время ожидания ffmpeg")
             return False
         finally:
-            # Очистка временных файлов
-            if self.config.get('advanced', {}).get('cleanup_temp', True):
-                import shutil
+            # Очистка временных файлов - только каталога этого запуска
+            if temp_dir is not None and advanced_config.get('cleanup_temp', True):
                 shutil.rmtree(temp_dir, ignore_errors=True)
 
+    def _probe_duration(self, video_path: str) -> Optional[float]:
+        """Длительность видео в секундах по данным ffprobe"""
+        try:
+            result = subprocess.run(
+                ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+                 '-of', 'default=noprint_wrappers=1:nokey=1', video_path],
+                capture_output=True, text=True, timeout=60)
+            return float(result.stdout.strip())
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            return None
+
     def _add_audio(self, video_path: str, audio_config: Dict) -> bool:
-        """Добавление аудио к видео"""
+        """Добавление аудио к видео: ffmpeg копирует видеодорожку без перекодирования"""
+        video_duration = self._probe_duration(video_path)
+        if video_duration is None:
+            self.logger.warning("Не удалось определить длительность видео, используется MoviePy")
+            return self._add_audio_moviepy(video_path, audio_config)
+
+        audio_start = audio_config.get('audio_start_ms', 0) / 1000
+        fade_in = audio_config.get('fade_in_ms', 0) / 1000
+        fade_out = audio_config.get('fade_out_ms', 0) / 1000
+        volume = audio_config.get('volume', 1.0)
+
+        # Громкость и затухания - один фильтр на аудиодорожке
+        audio_filters = [f"volume={volume}"]
+        if fade_in > 0:
+            audio_filters.append(f"afade=t=in:st=0:d={fade_in}")
+        if fade_out > 0:
+            audio_filters.append(f"afade=t=out:st={max(0.0, video_duration - fade_out)}:d={fade_out}")
+
+        temp_output = str(Path(video_path).with_suffix('.temp.mp4'))
+        cmd = [
+            'ffmpeg', '-y',
+            '-i', video_path,
+            '-ss', str(audio_start), '-t', str(video_duration),
+            '-i', audio_config['audio_file'],
+            '-map', '0:v:0', '-map', '1:a:0',
+            '-c:v', 'copy',
+            '-af', ','.join(audio_filters),
+            '-c:a', 'aac',
+            temp_output
+        ]
+        self.logger.info(f"Выполнение команды: {' '.join(cmd)}")
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+        except subprocess.TimeoutExpired:
+            self.logger.error("Превышено время ожидания ffmpeg при добавлении аудио")
+            return False
+        if result.returncode != 0:
+            self.logger.error(f"Ошибка ffmpeg при добавлении аудио: {result.stderr}")
+            Path(temp_output).unlink(missing_ok=True)
+            return self._add_audio_moviepy(video_path, audio_config)
+
+        # Заменяем оригинал
+        Path(temp_output).replace(video_path)
+        self.logger.info("Аудио добавлено успешно")
+        return True
+
+    def _add_audio_moviepy(self, video_path: str, audio_config: Dict) -> bool:
+        """Добавление аудио через MoviePy (с перекодированием видео) - запасной вариант"""
         if not MOVIEPY_AVAILABLE:
             self.logger.warning("MoviePy не доступен, аудио не будет добавлено")
             return False
@@ -320,6 +692,41 @@ class VideoCreator:
             print()
 
 
+def _deep_merge(base: Dict[str, Any], overrides: Dict[str, Any]):
+    """Рекурсивное наложение переопределений на конфигурацию (на месте)"""
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _deep_merge(base[key], value)
+        else:
+            base[key] = value
+
+
+def _run_batch_job(config_path: str, overrides: Dict[str, Any], dry_run: bool) -> bool:
+    """
+    Создание одного видео пакета в отдельном процессе. Общая temp_folder безопасна:
+    каждый запуск ffmpeg работает в собственном подкаталоге (mkdtemp)
+    """
+    creator = VideoCreator(config_path)
+    creator.config.pop('batch', None)
+    creator.apply_overrides(overrides)
+    return creator.create_video(dry_run=dry_run)
+
+
+def run_batch(config_path: str, batch: List[Dict[str, Any]], dry_run: bool = False) -> bool:
+    """Параллельное создание нескольких видео (ключ batch), по процессу на видео"""
+    # Половина ядер: каждый ffmpeg сам кодирует в несколько потоков
+    max_workers = max(1, min(len(batch), (os.cpu_count() or 2) // 2))
+    print(f"🎬 Пакетный режим: {len(batch)} видео, процессов: {max_workers}")
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_run_batch_job, config_path, overrides or {}, dry_run)
+                   for overrides in batch]
+        results = [future.result() for future in futures]
+
+    print(f"📊 Создано видео: {sum(results)} из {len(batch)}")
+    return all(results)
+
+
 def main():
     parser = argparse.ArgumentParser(description='Video Creator для Bird Detector')
     parser.add_argument('--config', '-c', default='video_creator_config.yaml',
@@ -338,8 +745,12 @@ def main():
     # Выводим сводку
     creator.print_config_summary()
 
-    # Создаем видео
-    success = creator.create_video(dry_run=args.dry_run)
+    # Создаем видео (несколько - параллельно, если задан ключ batch)
+    batch = creator.config.get('batch')
+    if batch:
+        success = run_batch(args.config, batch, dry_run=args.dry_run)
+    else:
+        success = creator.create_video(dry_run=args.dry_run)
 
     if success:
         print("\n✅ Видео создано успешно!")